@@ -0,0 +1,259 @@
+"""Parse many cutoff PDFs in one run into a year / round partitioned dataset.
+
+    python scripts/batch_parse.py <pdf_dir | manifest.json> <output_dir> [--workers N]
+        [--columns] [--search-index] [--page-cache DIR] [--rollups]
+
+A directory is searched (recursively) for PDFs named the way /api/cutoff/upload
+stores them, <examId>_<year>.pdf, with the analysis from <examId>_metadata.json
+when there is one. A manifest is a JSON list of entries
+
+    {"pdf": "mht-cet-mh-cap-round-2_2024-2025.pdf", "exam_id": "...", "year": "2024-2025",
+     "round": 2, "analysis": {"format_type": "...", "parsing_strategy": "..."}}
+
+where only "pdf" is required (relative to the manifest) and the rest default
+to what the directory scan would work out. Every PDF goes to
+
+    <output_dir>/<year>/round<N>/cutoffs_<examId>.csv
+
+(the year in the PDF's name wins over the metadata's; nothing is parsed when
+two PDFs would end up at the same path) and <output_dir>/index.json lists
+what was written. Each PDF's parsing strategy is picked once, from its
+analysis or its first Stage table (cutoff_engine.py). With --rollups every exam's rounds and years are also
+folded into <output_dir>/rollups_<exam family>.json (cutoff_rollups.py).
+Pages of all PDFs share one process pool (--workers 0, the default, is one
+worker per core): the next PDFs' page chunks are queued while the current one
+is still being written out, so the pool doesn't drain between files.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from cutoff_columns import ColumnarWriter
+from cutoff_index import SearchIndexWriter
+from cutoff_rollups import RollupWriter, exam_family
+from cutoff_engine import detect_strategy
+from cutoff_pipeline import print_summary, resolve_rows, resolve_workers, submit_page_results, write_rows_csv
+from sample_cache import SampleCache
+
+# PDFs whose pages are queued on the pool ahead of the one being written
+PREFETCH_FILES = 2
+
+# Partition for PDFs whose year or round can't be worked out
+UNKNOWN_PARTITION = "unknown"
+
+INDEX_FILE = "index.json"
+
+upload_name_pattern = re.compile(r"^(?P<exam_id>.+)_(?P<year>\d{4}(?:-\d{4})?)$")
+year_pattern = re.compile(r"(?<!\d)(20\d{2}(?:-20\d{2})?)(?!\d)")
+round_pattern = re.compile(r"round[-_ ]?(\d+)", re.IGNORECASE)
+
+
+def _guess_year(path):
+    match = year_pattern.search(path)
+    return match.group(1) if match else None
+
+
+def _guess_round(name):
+    match = round_pattern.search(name)
+    return int(match.group(1)) if match else None
+
+
+def _read_metadata(pdf_dir, exam_id):
+    metadata_path = os.path.join(pdf_dir, f"{exam_id}_metadata.json")
+    try:
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def make_job(pdf_path, exam_id=None, year=None, round=None, analysis=None):
+    """Fill in what a job entry leaves out from the PDF's name and its upload metadata."""
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    match = upload_name_pattern.match(stem)
+    metadata = _read_metadata(os.path.dirname(pdf_path), match.group("exam_id") if match else stem)
+
+    exam_id = exam_id or metadata.get("examId") or (match.group("exam_id") if match else stem)
+    # The metadata is per exam, not per PDF: with several years of one exam uploaded
+    # it holds the latest upload's year, so the year in the PDF's name comes first
+    year = year or (match.group("year") if match else None) or metadata.get("year") or _guess_year(pdf_path)
+    if round is None:
+        round = _guess_round(exam_id)
+    if analysis is None:
+        analysis = metadata.get("pdfAnalysis")
+
+    return {
+        "pdf": pdf_path,
+        "exam_id": exam_id,
+        "year": str(year) if year else UNKNOWN_PARTITION,
+        "round": f"round{round}" if round is not None else UNKNOWN_PARTITION,
+        "analysis": analysis
+    }
+
+
+def find_jobs(source):
+    """Jobs for every PDF under a directory, or for every entry of a manifest file."""
+    if os.path.isdir(source):
+        pdf_paths = []
+        for root, _, files in os.walk(source):
+            pdf_paths += [os.path.join(root, name) for name in files if name.lower().endswith(".pdf")]
+        return [make_job(pdf_path) for pdf_path in sorted(pdf_paths)]
+
+    with open(source, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(source))
+    return [
+        make_job(os.path.join(base_dir, entry["pdf"]), entry.get("exam_id"), entry.get("year"),
+                 entry.get("round"), entry.get("analysis"))
+        for entry in entries
+    ]
+
+
+def output_path(output_dir, job):
+    return os.path.join(output_dir, job["year"], job["round"], f"cutoffs_{job['exam_id']}.csv")
+
+
+def colliding_jobs(jobs, output_dir):
+    """{output CSV: [PDFs]} for outputs more than one job would write."""
+    pdfs_by_output = {}
+    for job in jobs:
+        pdfs_by_output.setdefault(output_path(output_dir, job), []).append(job["pdf"])
+    return {output: pdfs for output, pdfs in pdfs_by_output.items() if len(pdfs) > 1}
+
+
+def _start(job, executor, workers, page_cache):
+    print(f"\nQueueing {job['pdf']} -> {job['year']}/{job['round']}")
+    sample_cache = SampleCache(page_cache, job["pdf"])
+    strategy = detect_strategy(job["pdf"], job["analysis"], sample_cache=sample_cache)
+    job["strategy"] = strategy.name
+    return submit_page_results(job["pdf"], strategy.parse_page, executor, workers, page_cache,
+                               desc=os.path.basename(job["pdf"]), extract=strategy.extract, prune=strategy.prune,
+                               sample_cache=sample_cache)
+
+
+def run_batch(jobs, output_dir, workers, columns=False, page_cache=None, rollups=False, search_index=False):
+    """Parse every job on one shared pool, in order; returns one index entry per job."""
+    index = []
+    pending = deque()
+    remaining = iter(jobs)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def fill():
+            for job in remaining:
+                try:
+                    pending.append((job, _start(job, executor, workers, page_cache)))
+                except Exception as e:
+                    pending.append((job, e))
+                if len(pending) > PREFETCH_FILES:
+                    return
+
+        fill()
+        while pending:
+            job, page_results = pending.popleft()
+            fill()
+            index.append(_write_job(job, page_results, output_dir, columns, rollups, search_index))
+
+    return index
+
+
+def _write_job(job, page_results, output_dir, columns, rollups, search_index):
+    entry = {
+        "examId": job["exam_id"],
+        "year": job["year"],
+        "round": job["round"],
+        "pdf": job["pdf"],
+        "strategy": job.get("strategy"),
+        "csv": None,
+        "recordCount": 0
+    }
+    try:
+        if isinstance(page_results, Exception):
+            raise page_results
+
+        output_csv = output_path(output_dir, job)
+        os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+        sinks = [ColumnarWriter(output_csv)] if columns else []
+        if search_index:
+            sinks.append(SearchIndexWriter(output_csv))
+        if rollups and UNKNOWN_PARTITION not in (job["year"], job["round"]):
+            rollup_path = os.path.join(output_dir, f"rollups_{exam_family(job['exam_id'])}.json")
+            sinks.append(RollupWriter(rollup_path, job["year"], job["round"]))
+        summary = write_rows_csv(resolve_rows(page_results), output_csv, keep_empty=False, sinks=sinks)
+        if not summary["record_count"]:
+            raise ValueError("No data extracted from PDF")
+
+        print_summary(summary)
+        entry["csv"] = os.path.relpath(output_csv, output_dir)
+        entry["recordCount"] = summary["record_count"]
+    except Exception as e:
+        print(f"\n[ERROR] Failed to parse {job['pdf']}: {str(e)}")
+        entry["error"] = str(e)
+    return entry
+
+
+def write_index(output_dir, index):
+    index_path = os.path.join(output_dir, INDEX_FILE)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse a directory or manifest of CAP cutoff PDFs into "
+                                                 "<output_dir>/<year>/round<N>/ CSVs")
+    parser.add_argument("source", help="Directory of PDFs, or a JSON manifest")
+    parser.add_argument("output_dir")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Worker processes shared by all PDFs (0 = one per core, the default)")
+    parser.add_argument("--columns", action="store_true",
+                        help="Also write <output>.columns.bin/.json for fast loading by the API")
+    parser.add_argument("--search-index", action="store_true",
+                        help="Also write <output>.index.json for /api/cutoff/recommend")
+    parser.add_argument("--page-cache", metavar="DIR",
+                        help="Reuse results for pages whose content is unchanged since an earlier run")
+    parser.add_argument("--rollups", action="store_true",
+                        help="Also write per-exam trend rollups (rollups_<exam family>.json) to output_dir")
+    args = parser.parse_args()
+
+    try:
+        jobs = find_jobs(args.source)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[ERROR] Could not read {args.source}: {str(e)}")
+        sys.exit(1)
+    if not jobs:
+        print(f"[ERROR] No PDFs found in {args.source}")
+        sys.exit(1)
+    collisions = colliding_jobs(jobs, args.output_dir)
+    if collisions:
+        # The later PDF would overwrite the earlier one's CSV and rollup partition
+        for output, pdfs in collisions.items():
+            print(f"[ERROR] {', '.join(pdfs)} would all be written to {output}")
+        print("Give these PDFs distinct years / rounds in a manifest")
+        sys.exit(1)
+
+    workers = resolve_workers(args.workers)
+    print(f"PDFs: {len(jobs)}, workers: {workers}")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    index = run_batch(jobs, args.output_dir, workers, columns=args.columns, page_cache=args.page_cache,
+                      rollups=args.rollups, search_index=args.search_index)
+    index_path = write_index(args.output_dir, index)
+
+    failed = [entry for entry in index if "error" in entry]
+    print(f"\n[SUCCESS] {len(index) - len(failed)} of {len(index)} PDFs parsed, "
+          f"{sum(entry['recordCount'] for entry in index)} rows")
+    print(f"Index: {index_path}")
+    if failed:
+        for entry in failed:
+            print(f"[ERROR] {entry['pdf']}: {entry['error']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Micro-benchmark: classified page loop vs the old per-line cascade.
+
+Record page text once, then time both loops on it without touching pdfplumber:
+
+    python scripts/bench_line_classifier.py record <pdf_path> <pages.json>
+    python scripts/bench_line_classifier.py run <pages.json> [analysis_json] [--repeat N]
+
+"run" also checks that both loops return exactly the same rows and state.
+"""
+import argparse
+import json
+import re
+import time
+from string import ascii_uppercase
+
+import pdfplumber
+
+from cutoff_engine import DEFAULT_STRATEGY, SNIFF_PAGES, STRATEGIES, analysis_strategy, load_analysis, sniff_text
+from cutoff_pipeline import new_page_state, page_text
+from cutoff_rows import Heading, make_row
+from engineering_format import (
+    college_pattern, course_pattern, parse_page_text as parse_engineering_page_text, percentile_pattern,
+    rank_line_pattern, rank_number_pattern, stage_pattern
+)
+from line_classifier import LINE_TYPES, count_line_types
+from mba_format import (
+    mba_college_pattern, mba_course_pattern, mba_rank_pattern, parse_page_text as parse_mba_page_text
+)
+
+
+def legacy_parse_page_text(text, is_mba_format):
+    """The per-line regex / substring cascade the page parsers used before line_classifier.
+
+    Until the engine picked one strategy per PDF the MBA / engineering choice
+    was made here, on every line; is_mba_format now stands in for it so both
+    loops parse the same layout.
+    """
+    rows = []
+    state = new_page_state()
+    if not text:
+        return rows, state
+
+    current_college = state["college"]
+    current_course = state["course"]
+    current_seat_type = state["seat_type"]
+
+    lines = text.split("\n")
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if not line:
+            i += 1
+            continue
+
+        # MBA Format Parsing - Improved structure detection
+        if is_mba_format:
+            # Try to detect MBA college pattern (format: "CODE - NAME")
+            mba_college_match = mba_college_pattern.match(line)
+            if mba_college_match:
+                code = mba_college_match.group(1)
+                name = mba_college_match.group(2).strip()
+                # MBA college codes are typically 4 digits
+                if len(code) <= 6:
+                    current_college = Heading(code, name)
+                    current_course = None
+                    current_seat_type = None
+
+            # Try to detect MBA course/program (format: "CODE - NAME")
+            # Course codes are longer (8-9 digits)
+            mba_course_match = mba_course_pattern.match(line)
+            if mba_course_match:
+                code = mba_course_match.group(1)
+                name = mba_course_match.group(2).strip()
+                if len(code) >= 6:
+                    current_course = Heading(code, name)
+
+            # Seat Type detection for MBA
+            if "Home University Seats Allotted to Home University Candidates" in line:
+                current_seat_type = "Home University Seats Allotted to Home University Candidates"
+            elif "Other Than Home University Seats Allotted to Other Than Home University Candidates" in line:
+                current_seat_type = "Other Than Home University Seats Allotted to Other Than Home University Candidates"
+            elif "Other Than Home University Seats Allotted to Home University Candidates" in line:
+                current_seat_type = "Other Than Home University Seats Allotted to Home University Candidates"
+            elif "State Level" in line and "Seats" not in line:
+                current_seat_type = "State Level"
+
+            # MBA structure: Categories line -> Ranks line -> "Stage-I" -> Percentiles line
+            # Check if we have college and course, seat_type might be set on previous lines
+            if current_college and current_course:
+                # Look for categories line (contains category codes like GOPENH, GSCH, etc.)
+                # Category codes are typically uppercase letters, 3-8 chars, often starting with G, L, E, T, etc.
+                category_codes = re.findall(r'\b([A-Z]{3,8})\b', line)
+
+                # Filter out common non-category words
+                filtered_categories = [cat for cat in category_codes
+                                     if cat not in ['STAGE', 'STATUS', 'UNIVERSITY', 'DEPARTMENT', 'HOME', 'OTHER', 'THAN', 'ALLOTTED', 'CANDIDATES', 'LEVEL']]
+
+                # If we found category codes, look for ranks and percentiles in next lines
+                if filtered_categories and len(filtered_categories) >= 2:
+                    # Next line should have ranks (numbers)
+                    if i + 1 < len(lines):
+                        ranks_line = lines[i + 1].strip()
+                        ranks = mba_rank_pattern.findall(ranks_line)
+
+                        # Look for "Stage-I" or "Stage" line
+                        percentiles_line_idx = i + 2
+
+                        if i + 2 < len(lines):
+                            next_line = lines[i + 2].strip()
+                            if "Stage" in next_line:
+                                percentiles_line_idx = i + 3
+
+                        # Percentiles are in parentheses on the line after Stage (or same line if no Stage)
+                        if percentiles_line_idx < len(lines):
+                            percentiles_line = lines[percentiles_line_idx].strip()
+                            percentiles = percentile_pattern.findall(percentiles_line)
+
+                            # Match categories with ranks and percentiles by index
+                            for idx, category in enumerate(filtered_categories):
+                                rank = int(ranks[idx]) if idx < len(ranks) and ranks[idx].isdigit() else 0
+                                percentile = float(percentiles[idx]) if idx < len(percentiles) else 0.0
+
+                                rows.append(make_row(
+                                    current_college,
+                                    current_course,
+                                    current_seat_type,
+                                    category,
+                                    rank,
+                                    percentile
+                                ))
+
+        # Engineering Format Parsing (original logic)
+        else:
+            # College detection (an unrecognised heading keeps the current college / course)
+            college_match = college_pattern.match(line)
+            if college_match and 3 <= len(college_match.group(1)) <= 5:
+                code = college_match.group(1)
+                name = college_match.group(2).strip()
+                current_college = Heading(code, name)
+                current_course = None
+
+            # Course detection
+            course_match = course_pattern.match(line)
+            if course_match and len(course_match.group(1).rstrip(ascii_uppercase)) >= 7 \
+                    and len(course_match.group(1)) >= 8:
+                code = course_match.group(1)
+                name = course_match.group(2).strip()
+                current_course = Heading(code, name)
+
+            # Seat Type detection
+            if "State Level" in line and "Stage" not in line:
+                current_seat_type = "State Level"
+            elif "Home University Seats Allotted to Home University Candidates" in line:
+                current_seat_type = "Home University Seats Allotted to Home University Candidates"
+            elif "Home University Seats Allotted to Other Than Home University Candidates" in line:
+                current_seat_type = "Home University Seats Allotted to Other Than Home University Candidates"
+            elif "Other Than Home University Seats Allotted to Other Than Home University Candidates" in line:
+                current_seat_type = "Other Than Home University Seats Allotted to Other Than Home University Candidates"
+
+            # Stage line detection
+            stage_match = stage_pattern.match(line)
+            if stage_match and current_college and current_course:
+                categories = stage_match.group(1).split()
+
+                if i + 1 < len(lines):
+                    rank_line = lines[i + 1].strip()
+                    rank_match = rank_line_pattern.match(rank_line)
+
+                    if rank_match:
+                        rank_numbers = rank_number_pattern.findall(rank_match.group(1))
+
+                        if i + 2 < len(lines):
+                            percentile_line = lines[i + 2].strip()
+                            percentiles = percentile_pattern.findall(percentile_line)
+
+                            for idx, category in enumerate(categories):
+                                if idx < len(rank_numbers) and idx < len(percentiles):
+                                    rows.append(make_row(
+                                        current_college,
+                                        current_course,
+                                        current_seat_type,
+                                        category,
+                                        int(rank_numbers[idx]),
+                                        float(percentiles[idx])
+                                    ))
+
+        i += 1
+
+    state["college"] = current_college
+    state["course"] = current_course
+    state["seat_type"] = current_seat_type
+    return rows, state
+
+
+
+def record(pdf_path, pages_json):
+    with pdfplumber.open(pdf_path) as pdf:
+        pages = [page.extract_text() or "" for page in pdf.pages]
+    with open(pages_json, "w", encoding="utf-8") as f:
+        json.dump(pages, f)
+    print(f"Recorded {len(pages)} pages to {pages_json}")
+
+
+def pages_strategy(pages, analysis):
+    """The Strategy cutoff_engine.detect_strategy() would pick, from recorded page text."""
+    name = analysis_strategy(analysis)
+    if name is None:
+        name = next(filter(None, map(sniff_text, pages[:SNIFF_PAGES])), DEFAULT_STRATEGY)
+    return STRATEGIES[name]
+
+
+def time_loop(parse_page, pages, repeat, *options):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse_page(text, *options) for text in pages]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def run(pages_json, analysis, repeat):
+    with open(pages_json, "r", encoding="utf-8") as f:
+        pages = json.load(f)
+
+    strategy = pages_strategy(pages, analysis)
+    if strategy.extract is not page_text:
+        print(f"[ERROR] {strategy.name} does not parse extract_text() lines")
+        return False
+    if strategy.parse_page not in (parse_engineering_page_text, parse_mba_page_text):
+        print(f"[ERROR] {strategy.name} has no legacy loop to compare with")
+        return False
+    is_mba_format = strategy.parse_page is parse_mba_page_text
+    line_count = sum(len(text.split("\n")) for text in pages)
+
+    print(f"Strategy: {strategy.name}")
+    legacy_time, legacy_results = time_loop(legacy_parse_page_text, pages, repeat, is_mba_format)
+    classified_time, classified_results = time_loop(strategy.parse_page, pages, repeat)
+
+    # The legacy loop predates page_stats; compare rows and state
+    mismatched = [n + 1 for n, (a, b) in enumerate(zip(legacy_results, classified_results)) if a != b[:2]]
+
+    counts = dict.fromkeys(LINE_TYPES, 0)
+    for text in pages:
+        for line_type, count in count_line_types(text.split("\n")).items():
+            counts[line_type] += count
+
+    print(f"Pages: {len(pages)}  Lines: {line_count}  Best of {repeat}")
+    print(f"Legacy cascade:   {legacy_time * 1000:9.1f} ms  ({line_count / legacy_time:,.0f} lines/s)")
+    print(f"Line classifier:  {classified_time * 1000:9.1f} ms  ({line_count / classified_time:,.0f} lines/s)")
+    print(f"Speedup: {legacy_time / classified_time:.2f}x")
+    print("Line types: " + ", ".join(f"{line_type}={count}" for line_type, count in counts.items()))
+    if mismatched:
+        print(f"[ERROR] Results differ on pages: {mismatched[:20]}")
+        return False
+    print("Results identical")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Save every page's extract_text() to JSON")
+    record_parser.add_argument("pdf_path")
+    record_parser.add_argument("pages_json")
+
+    run_parser = commands.add_parser("run", help="Time both loops on recorded page text")
+    run_parser.add_argument("pages_json")
+    run_parser.add_argument("analysis_json", nargs="?", default="{}")
+    run_parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.pdf_path, args.pages_json)
+    elif not run(args.pages_json, load_analysis(args.analysis_json), args.repeat):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Parser throughput benchmark on synthetic CAP cutoff PDFs.
+
+Generates engineering and MBA PDFs with synthetic_cutoff_pdf.py, runs every
+parser on them offline (serially, one fresh process per run so peak RSS is
+per parser) and compares the results with the baseline in bench_baseline.json:
+
+    python scripts/bench_parsers.py                      # run and compare
+    python scripts/bench_parsers.py --update-baseline    # run and store as the new baseline
+    python scripts/bench_parsers.py --case mba/dynamic --pages 100 --repeat 5
+
+Every run is a parse_pdf() call, as the parser script makes it. Reported per
+case: pages/sec, rows/sec, peak RSS, pages pruned by the pre-scan
+(page_prescan.py), and the ParseMetrics that parse_pdf() fills in (what
+--metrics-json writes): seconds spent opening the PDF, in the pre-scan and
+extract_text() / extract_words(), in the page parser and writing the CSV, and
+the median and slowest page. Exits 1 when throughput drops or RSS grows by more than --threshold
+against the baseline, when a parser emits a different number of rows, or
+when pruning pages with the pre-scan changes the rows of a strategy that
+prunes (every case is also parsed once with pruning off and once with it
+forced on; for strategies that parse every page the difference is only
+reported).
+Timings are machine dependent: refresh the baseline on the same machine before
+comparing a change.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+MBA_ANALYSIS = {"format_type": "mba_cutoff", "parsing_strategy": "mba_format"}
+
+# name -> (synthetic PDF, parser script, analysis JSON for parse_cutoff_dynamic)
+CASES = {
+    "engineering/parse_cutoff": ("engineering", "parse_cutoff", None),
+    "engineering/dynamic": ("engineering", "parse_cutoff_dynamic", {"parsing_strategy": "engineering_format"}),
+    "engineering/geometry": ("engineering", "parse_cutoff_dynamic", {"parsing_strategy": "geometry_format"}),
+    "mba/dynamic": ("mba", "parse_cutoff_dynamic", MBA_ANALYSIS),
+    "mba-sparse/dynamic": ("mba-sparse", "parse_cutoff_dynamic", MBA_ANALYSIS),
+}
+
+# synthetic PDF -> (generate_cutoff_pdf() format, filler pages per page with cutoffs)
+PDFS = {
+    "engineering": ("engineering", 0),
+    "mba": ("mba", 0),
+    # Cover / notes pages between the cutoff pages, one for one
+    "mba-sparse": ("mba", 1),
+}
+
+# Higher is better for throughput, lower for memory
+THROUGHPUT_METRICS = ("pages_per_sec", "rows_per_sec")
+MEMORY_METRICS = ("peak_rss_mb",)
+# ParseMetrics phases, then the whole run
+TIME_METRICS = ("open_s", "extract_s", "parse_s", "write_s", "total_s")
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _strategy(pdf_path, parser, analysis):
+    from cutoff_engine import detect_strategy, get_strategy
+    if parser == "parse_cutoff":
+        # parse_cutoff.py always reads the engineering layout
+        return get_strategy("engineering_format")
+    return detect_strategy(pdf_path, analysis)
+
+
+def measure(pdf_path, parser, analysis):
+    """One timed serial parse_pdf() of pdf_path; runs inside a fresh process (see run_case)."""
+    from cutoff_engine import parse_pdf
+    from parse_metrics import ParseMetrics
+
+    # parse_cutoff.py always reads the engineering layout and writes no empty CSV
+    options = {"strategy": "engineering_format", "keep_empty": False} if parser == "parse_cutoff" else {}
+    metrics = ParseMetrics()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        summary = parse_pdf(pdf_path, os.path.join(tmp_dir, "cutoffs.csv"), analysis, metrics=metrics, **options)
+    report = metrics.to_dict()
+
+    total = report["totalSeconds"]
+    # (seconds, page number) for every page, extraction and parsing together
+    page_seconds = sorted((page["extractSeconds"] + page["parseSeconds"], page["page"]) for page in report["pages"])
+    return {
+        "pages": report["pageCount"],
+        "rows": summary["record_count"],
+        "pages_per_sec": round(report["pageCount"] / total, 2),
+        "rows_per_sec": round(summary["record_count"] / total, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "pruned_pages": report["prunedPages"],
+        **{f"{phase}_s": seconds for phase, seconds in report["phaseSeconds"].items()},
+        "total_s": total,
+        "page_median_s": round(page_seconds[len(page_seconds) // 2][0], 4),
+        "page_max_s": round(page_seconds[-1][0], 4),
+        "slowest_page": page_seconds[-1][1]
+    }
+
+
+def pruning_changes(pdf_path, parser, analysis):
+    """(rows that differ between a parse with the pre-scan forced on and one of every page, strategy.prune)."""
+    from collections import Counter
+    from contextlib import redirect_stdout
+
+    from cutoff_pipeline import iter_page_results, resolve_rows
+    from parse_metrics import ParseMetrics
+
+    def rows(prune):
+        # A progress callback keeps the tqdm bar off
+        metrics = ParseMetrics(progress=lambda metrics: None)
+        page_results = iter_page_results(pdf_path, strategy.parse_page, metrics=metrics, extract=strategy.extract,
+                                         prune=prune)
+        return Counter(tuple(row.csv_values()) for row in resolve_rows(page_results))
+
+    with redirect_stdout(sys.stderr):
+        strategy = _strategy(pdf_path, parser, analysis)
+        pruned, unpruned = rows(True), rows(False)
+    changed = (pruned - unpruned) + (unpruned - pruned)
+    return sum(changed.values()), strategy.prune
+
+
+def run_case(pdf_path, parser, analysis, repeat):
+    """Best of `repeat` runs, each in its own interpreter so RSS and caches start cold."""
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--measure", pdf_path, parser, json.dumps(analysis)],
+            capture_output=True, text=True, check=True
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or result["total_s"] < best["total_s"]:
+            best = result
+    return best
+
+
+def compare(results, baseline, threshold):
+    """Lines describing regressions against the baseline (empty when there are none)."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["rows"] != base["rows"]:
+            regressions.append(f"{name}: rows {base['rows']} -> {result['rows']}")
+        for metric in THROUGHPUT_METRICS:
+            if result[metric] < base[metric] * (1 - threshold):
+                regressions.append(f"{name}: {metric} {base[metric]} -> {result[metric]}")
+        for metric in MEMORY_METRICS:
+            if result[metric] is not None and base.get(metric) and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {base[metric]} -> {result[metric]}")
+    return regressions
+
+
+def _change(value, base):
+    if not base or value is None:
+        return ""
+    return f" ({(value - base) / base:+.0%})"
+
+
+def print_results(results, baseline):
+    for name, result in results.items():
+        base = baseline.get(name, {})
+        print(f"\n{name}: {result['pages']} pages ({result.get('pruned_pages', 0)} pruned), {result['rows']} rows "
+              f"(synthetic PDF holds {result['expected_rows']})")
+        for metric in THROUGHPUT_METRICS + MEMORY_METRICS:
+            print(f"  {metric:<14}{result[metric]}{_change(result[metric], base.get(metric))}")
+        split = ", ".join(f"{metric[:-2]} {result[metric]}s" for metric in TIME_METRICS[:-1])
+        print(f"  time split    {split} of {result['total_s']}s")
+        print(f"  per page      median {result['page_median_s']}s, slowest {result['page_max_s']}s "
+              f"(page {result['slowest_page']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cutoff parsers on synthetic CAP PDFs")
+    parser.add_argument("--case", action="append", choices=sorted(CASES),
+                        help="Only run this case (repeatable; default all)")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per synthetic PDF (default 40)")
+    parser.add_argument("--courses", type=int, default=4, help="Courses per college (default 4)")
+    parser.add_argument("--categories", type=int, default=8, help="Categories per Stage table (default 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Keep the best of N runs per case (default 3)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed fractional slowdown / RSS growth before failing (default 0.2)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--measure", nargs=3, metavar=("PDF", "PARSER", "ANALYSIS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        pdf_path, parser_name, analysis = args.measure
+        print(json.dumps(measure(pdf_path, parser_name, json.loads(analysis))))
+        return
+
+    # Imported here so --measure processes only load what the parser itself needs
+    from synthetic_cutoff_pdf import generate_cutoff_pdf
+
+    config = {"pages": args.pages, "courses": args.courses, "categories": args.categories}
+    names = args.case or list(CASES)
+    results = {}
+    pruning_changed = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdfs = {}
+        for name in names:
+            pdf_name, parser_name, analysis = CASES[name]
+            if pdf_name not in pdfs:
+                pdf_path = os.path.join(tmp_dir, f"{pdf_name}.pdf")
+                pdf_format, fillers_per_page = PDFS[pdf_name]
+                info = generate_cutoff_pdf(pdf_path, pdf_format, args.pages, None, args.courses, args.categories,
+                                           filler_pages=args.pages * fillers_per_page)
+                pdfs[pdf_name] = (pdf_path, info)
+
+            pdf_path, info = pdfs[pdf_name]
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = run_case(pdf_path, parser_name, analysis, args.repeat)
+            results[name]["expected_rows"] = info["rows"]
+            pruning_changed[name] = pruning_changes(pdf_path, parser_name, analysis)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("config") == config:
+            baseline = stored["cases"]
+        else:
+            print(f"Baseline was recorded with {stored.get('config')}; not comparing", file=sys.stderr)
+
+    print_results(results, baseline)
+    for name, (changed, prunes) in pruning_changed.items():
+        if changed and not prunes:
+            print(f"\n{name}: the pre-scan would change {changed} rows; this strategy parses every page")
+
+    if args.update_baseline:
+        stored = {
+            "config": config,
+            "machine": f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+            "cases": {**baseline, **results}
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    regressions += [f"{name}: pruning pages with the pre-scan changes {changed} rows"
+                    for name, (changed, prunes) in pruning_changed.items() if changed and prunes]
+    if regressions:
+        print("\n[REGRESSION] Against the baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+from array import array
+
+# Bump when the layout below changes so stale readers fall back to the CSV
+COLUMNS_VERSION = 1
+
+# Every column starts on an 8-byte boundary so readers can view it in place
+COLUMN_ALIGNMENT = 8
+
+# (column, array typecode, manifest type, dictionary it indexes into)
+COLUMN_LAYOUT = [
+    ("percentile", "d", "float64", None),
+    ("rank", "i", "int32", None),
+    ("college", "i", "int32", "college"),
+    ("course", "i", "int32", "course"),
+    ("seat_type", "i", "int32", "seat_type"),
+    ("category", "i", "int32", "category"),
+]
+
+
+def columns_paths(output_csv):
+    """cutoffs_x.csv -> (cutoffs_x.columns.bin, cutoffs_x.columns.json)"""
+    base = output_csv[:-4] if output_csv.endswith(".csv") else output_csv
+    return f"{base}.columns.bin", f"{base}.columns.json"
+
+
+class ColumnarWriter:
+    """Row sink that builds a dictionary-encoded columnar copy of the CSV.
+
+    college / course / seat_type / category become int32 ids into small
+    dictionaries in the manifest; rank is int32 and percentile float64 (the
+    PDFs publish 7 decimals, more than float32 holds). The .bin file is the
+    columns back to back, little-endian, so readers can load it with one read.
+    """
+
+    def __init__(self, output_csv):
+        self.bin_path, self.manifest_path = columns_paths(output_csv)
+        self.dictionaries = {name: {} for _, _, _, name in COLUMN_LAYOUT if name}
+        self.columns = {column: array(typecode) for column, typecode, _, _ in COLUMN_LAYOUT}
+
+    def _encode(self, dictionary, key):
+        ids = self.dictionaries[dictionary]
+        code = ids.get(key)
+        if code is None:
+            code = ids[key] = len(ids)
+        return code
+
+    def add(self, row):
+        columns = self.columns
+        columns["percentile"].append(row.percentile)
+        columns["rank"].append(row.rank)
+        # Headings are (code, name) tuples, so they key the dictionaries as they are
+        columns["college"].append(self._encode("college", row.college))
+        columns["course"].append(self._encode("course", row.course))
+        columns["seat_type"].append(self._encode("seat_type", row.seat_type))
+        columns["category"].append(self._encode("category", row.category))
+
+    def close(self, summary):
+        manifest_columns = {}
+        offset = 0
+
+        tmp_bin = f"{self.bin_path}.tmp"
+        with open(tmp_bin, "wb") as f:
+            for column, _, column_type, dictionary in COLUMN_LAYOUT:
+                values = self.columns[column]
+                if sys.byteorder != "little":
+                    values.byteswap()
+
+                padding = -offset % COLUMN_ALIGNMENT
+                f.write(b"\0" * padding)
+                offset += padding
+
+                values.tofile(f)
+                manifest_columns[column] = {
+                    "type": column_type,
+                    "offset": offset,
+                    "byteLength": len(values) * values.itemsize
+                }
+                if dictionary:
+                    manifest_columns[column]["dictionary"] = dictionary
+                offset += len(values) * values.itemsize
+
+        manifest = {
+            "version": COLUMNS_VERSION,
+            "rowCount": summary["record_count"],
+            # Lets readers notice a CSV that was replaced without re-running the parser
+            "csvBytes": summary["csv_bytes"],
+            "binFile": os.path.basename(self.bin_path),
+            "columns": manifest_columns,
+            "dictionaries": {
+                "college": [list(key) for key in self.dictionaries["college"]],
+                "course": [list(key) for key in self.dictionaries["course"]],
+                "seat_type": list(self.dictionaries["seat_type"]),
+                "category": list(self.dictionaries["category"])
+            }
+        }
+
+        tmp_manifest = f"{self.manifest_path}.tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        os.replace(tmp_bin, self.bin_path)
+        os.replace(tmp_manifest, self.manifest_path)
+        print(f"Columnar copy: {self.manifest_path}")
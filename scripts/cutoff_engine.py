@@ -0,0 +1,217 @@
+"""One parser for every CAP cutoff layout, picked once per PDF.
+
+A strategy is a page parser plus the extractor that feeds it, registered
+under the parsing_strategy name analyze-pdf uses:
+
+    engineering_format  Stage lines with categories, then ranks and percentiles (engineering_format.py)
+    geometry_format     the same layout read from word positions (opt in only)
+    mba_format          categories, ranks, Stage label, percentiles (mba_format.py)
+    mca_format          MCA PDFs use the MBA layout
+    me_format           Stage lines with categories, then merit(score) pairs (me_format.py)
+
+The strategy comes from the analysis when it names a registered one other
+than the default. Otherwise (no analysis, or analyze-pdf's catch-all
+"engineering_format") the first page with a Stage table is read and every
+registered sniffer gets a look at it. Pages then all go through the same
+pipeline (cutoff_pipeline.py) with that one page parser.
+
+A new layout (pharmacy, ...) is a module with parse_page_text() and sniff()
+plus a register_strategy() call below; parse_cutoff.py, parse_cutoff_dynamic.py,
+parser_daemon.py and batch_parse.py pick it up without changes.
+"""
+import json
+from collections import namedtuple
+
+import pdfplumber
+
+import engineering_format
+import mba_format
+import me_format
+from cutoff_columns import ColumnarWriter
+from cutoff_index import SearchIndexWriter
+from cutoff_pipeline import iter_page_results, page_text, print_summary, resolve_rows, write_rows_csv
+from cutoff_rollups import RollupWriter
+from geometry_engine import page_words
+from page_prescan import may_have_rows
+from parse_metrics import ParseMetrics, print_progress
+from sample_cache import SampleCache
+
+# parse_page(extract(page)) -> (rows, state, page_stats) for every page.
+# sniff(lines) -> True when a page's stripped, non-empty extract_text() lines
+# are in this layout; None for strategies that are only used when asked for.
+# prune: whether pages the pre-scan (page_prescan.py) rules out are skipped.
+Strategy = namedtuple("Strategy", ["name", "parse_page", "extract", "sniff", "prune"])
+
+STRATEGIES = {}
+
+DEFAULT_STRATEGY = "engineering_format"
+
+# Pages read looking for a Stage table before falling back to DEFAULT_STRATEGY; all
+# of them are among the pages the parse keeps in the SampleCache (sample_cache.py)
+SNIFF_PAGES = 5
+
+
+def register_strategy(name, parse_page, extract=page_text, sniff=None, prune=True):
+    """Make a page parser available as parsing_strategy name.
+
+    parse_page and extract must be module-level functions so pool workers can
+    run them. Sniffers are tried in registration order. prune=False is for
+    parsers that can emit rows from a page with no cutoff table on it.
+    """
+    STRATEGIES[name] = Strategy(name, parse_page, extract, sniff, prune)
+
+
+register_strategy("engineering_format", engineering_format.parse_page_text, sniff=engineering_format.sniff)
+register_strategy("geometry_format", engineering_format.parse_page_words, extract=page_words)
+# The MBA parser reads any line of two or more capitalised words under a course
+# as categories (rank 0 rows), notes pages included, so every page is parsed
+register_strategy("mba_format", mba_format.parse_page_text, sniff=mba_format.sniff, prune=False)
+register_strategy("mca_format", mba_format.parse_page_text, prune=False)
+register_strategy("me_format", me_format.parse_page_text, sniff=me_format.sniff)
+
+
+def get_strategy(name):
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown parsing strategy: {name} (known: {', '.join(STRATEGIES)})") from None
+
+
+def load_analysis(analysis_json):
+    # Parse analysis if provided
+    analysis = {}
+    try:
+        if analysis_json and analysis_json != '{}':
+            analysis = json.loads(analysis_json)
+    except:
+        pass
+    return analysis
+
+
+def analysis_strategy(analysis):
+    """The strategy an analyze-pdf analysis asks for, or None when it leaves the choice to the PDF."""
+    name = (analysis or {}).get('parsing_strategy')
+    if name in STRATEGIES and name != DEFAULT_STRATEGY:
+        return name
+    if (analysis or {}).get('format_type') == 'mba_cutoff':
+        return 'mba_format'
+    return None
+
+
+def sniff_text(text):
+    """Strategy whose sniffer recognises one page's extract_text(), or None."""
+    lines = [line.strip() for line in (text or "").split("\n")]
+    lines = [line for line in lines if line]
+    for strategy in STRATEGIES.values():
+        if strategy.sniff is not None and strategy.sniff(lines):
+            return strategy.name
+    return None
+
+
+def sniff_pdf(pdf_path, page_cache=None, sample_cache=None):
+    """(strategy name, page number) from the first of SNIFF_PAGES pages a sniffer recognises, or (None, None).
+
+    Pages are read through sample_cache, or through the SampleCache of the
+    page_cache directory (in memory without one): text analyze-pdf already
+    extracted is reused, and text extracted here is kept for the parse.
+    """
+    if sample_cache is None:
+        sample_cache = SampleCache(page_cache, pdf_path)
+    found = None, None
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[:SNIFF_PAGES]:
+            if not may_have_rows(page):
+                continue
+            name = sniff_text(sample_cache.text(page))
+            if name is not None:
+                found = name, page.page_number
+                break
+    sample_cache.save()
+    return found
+
+
+def detect_strategy(pdf_path, analysis=None, page_cache=None, sample_cache=None):
+    """The Strategy for pdf_path: the analysis' if it names one, else sniffed from the PDF, else the default.
+
+    Pass the sample_cache the parse will use (iter_page_results()) so the
+    sniffed page isn't extracted again.
+    """
+    name = analysis_strategy(analysis)
+    if name is not None:
+        print(f"Using strategy: {name} (from analysis)")
+        return STRATEGIES[name]
+
+    name, page_number = sniff_pdf(pdf_path, page_cache, sample_cache)
+    if name is not None:
+        print(f"Using strategy: {name} (detected on page {page_number})")
+        return STRATEGIES[name]
+
+    print(f"Using strategy: {DEFAULT_STRATEGY} (no layout detected)")
+    return STRATEGIES[DEFAULT_STRATEGY]
+
+
+def parse_pdf(pdf_path, output_csv, analysis=None, strategy=None, keep_empty=True, workers=1, executor=None,
+              columns=False, page_cache=None, metrics=None, rollups=None, search_index=False):
+    """Parse pdf_path into output_csv with one strategy and return a summary of what was written.
+
+    strategy is a registered name; without one it is detected from analysis
+    and the PDF (detect_strategy()). With keep_empty an empty CSV with headers
+    is written when nothing matches, so uploads still succeed; otherwise
+    nothing is written (record_count is 0). With columns=True a
+    dictionary-encoded columnar copy is written alongside. Timings and
+    counters go into metrics (a ParseMetrics) when one is passed. rollups
+    ({"path", "year", "round"}) merges this PDF's per-key trend stats into a
+    rollups file (cutoff_rollups.py). With search_index=True the query index
+    for /api/cutoff/recommend (cutoff_index.py) is written alongside.
+    """
+    print(f"Reading PDF: {pdf_path}")
+    sample_cache = None
+    if strategy is None:
+        sample_cache = SampleCache(page_cache, pdf_path)
+        strategy = detect_strategy(pdf_path, analysis, sample_cache=sample_cache)
+    else:
+        strategy = get_strategy(strategy)
+        print(f"Using strategy: {strategy.name}")
+
+    page_results = iter_page_results(pdf_path, strategy.parse_page, workers=workers, executor=executor,
+                                     page_cache=page_cache, metrics=metrics, extract=strategy.extract,
+                                     prune=strategy.prune, sample_cache=sample_cache)
+    sinks = [ColumnarWriter(output_csv)] if columns else []
+    if rollups:
+        sinks.append(RollupWriter(rollups["path"], rollups["year"], rollups["round"]))
+    if search_index:
+        sinks.append(SearchIndexWriter(output_csv))
+    summary = write_rows_csv(resolve_rows(page_results, metrics=metrics), output_csv, keep_empty=keep_empty,
+                             sinks=sinks, metrics=metrics)
+    summary["strategy"] = strategy.name
+
+    if summary["record_count"]:
+        print_summary(summary)
+    elif keep_empty:
+        print("\n[WARNING] No data extracted from PDF")
+        print("The PDF format might not match expected patterns.")
+        print("Created empty CSV with headers")
+    return summary
+
+
+def add_engine_arguments(parser):
+    """Output / performance options shared by the parser CLIs."""
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse pages in N processes (0 = one per core, default 1)")
+    parser.add_argument("--columns", action="store_true",
+                        help="Also write <output>.columns.bin/.json for fast loading by the API")
+    parser.add_argument("--search-index", action="store_true",
+                        help="Also write <output>.index.json for /api/cutoff/recommend")
+    parser.add_argument("--page-cache", metavar="DIR",
+                        help="Reuse results for pages whose content is unchanged since an earlier run")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="Write phase / per-page timings, line counts and dropped rows to PATH")
+    parser.add_argument("--progress-json", action="store_true",
+                        help="Report progress as JSON lines (pages done, rows so far, ETA) on stderr instead of a bar")
+
+
+def metrics_from_args(args):
+    """parse_pdf()'s metrics argument from add_engine_arguments() options, or None."""
+    if not (args.metrics_json or args.progress_json):
+        return None
+    return ParseMetrics(progress=print_progress if args.progress_json else None)
@@ -0,0 +1,86 @@
+import json
+import os
+import re
+
+# Bump when the layout below changes so stale readers fall back to scanning rows
+INDEX_VERSION = 2
+
+BUCKET_SEPARATOR = "|"
+
+token_pattern = re.compile(r"[a-z0-9]+")
+
+
+def index_path(output_csv):
+    """cutoffs_x.csv -> cutoffs_x.index.json"""
+    base = output_csv[:-4] if output_csv.endswith(".csv") else output_csv
+    return f"{base}.index.json"
+
+
+def tokens(text):
+    """Lowercased alphanumeric words of a course name."""
+    return set(token_pattern.findall(text.lower()))
+
+
+class SearchIndexWriter:
+    """Row sink that builds the query index /api/cutoff/recommend searches instead of scanning rows.
+
+    Row ids are positions in the CSV (and in the columnar copy). The index has
+
+    - buckets: "<category>|<seat_type>" -> ids of rows with a percentile,
+      sorted by percentile, so "cutoffs my percentile clears" is a binary search
+    - courseTokens: word of the course name -> ids, ascending, for
+      posting-list intersection (locations are matched by substring, which
+      word postings can't narrow, so there is no location list)
+    - courses / categories: distinct values of rows with a rank or percentile,
+      in first-seen order
+    """
+
+    def __init__(self, output_csv):
+        self.path = index_path(output_csv)
+        self.row_count = 0
+        self.buckets = {}
+        self.course_tokens = {}
+        self.courses = {}
+        self.categories = {}
+        # Names repeat row after row; tokenise each distinct one once
+        self._token_cache = {}
+
+    def _name_tokens(self, name):
+        name_tokens = self._token_cache.get(name)
+        if name_tokens is None:
+            name_tokens = self._token_cache[name] = sorted(tokens(name))
+        return name_tokens
+
+    def add(self, row):
+        row_id = self.row_count
+        self.row_count += 1
+
+        if row.percentile > 0:
+            bucket = self.buckets.setdefault(f"{row.category}{BUCKET_SEPARATOR}{row.seat_type}", [])
+            bucket.append((row.percentile, row_id))
+
+        for token in self._name_tokens(row.course.name):
+            self.course_tokens.setdefault(token, []).append(row_id)
+
+        # The route's row scan picks courses / categories from rows with a rank or percentile
+        if row.rank > 0 or row.percentile > 0:
+            self.courses.setdefault(row.course.name, None)
+            self.categories.setdefault(row.category, None)
+
+    def close(self, summary):
+        index = {
+            "version": INDEX_VERSION,
+            "rowCount": summary["record_count"],
+            # Lets readers notice a CSV that was replaced without re-running the parser
+            "csvBytes": summary["csv_bytes"],
+            "buckets": {bucket: [row_id for _, row_id in sorted(rows)] for bucket, rows in self.buckets.items()},
+            "courseTokens": self.course_tokens,
+            "courses": list(self.courses),
+            "categories": list(self.categories)
+        }
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        print(f"Search index: {self.path}")
@@ -0,0 +1,359 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+
+import pdfplumber
+from tqdm import tqdm
+
+from cutoff_rows import CSV_COLUMNS
+from page_cache import PageCache
+from page_prescan import may_have_rows
+from parse_metrics import UNRESOLVED_HEADING, ParseMetrics, new_page_stats
+from sample_cache import SampleCache, parse_sampled_page_numbers
+
+# Each page is parsed on its own, starting from "don't know yet" state, so pages
+# can be handed to different processes. Rows that rely on a college / course /
+# seat type set on an earlier page keep INHERIT in that slot and get resolved
+# when the pages are merged back in order.
+INHERIT = "__inherit__"
+
+STATE_KEYS = ("college", "course", "seat_type")
+
+# Rows kept aside for the "Sample data" printout
+SAMPLE_ROWS = 10
+
+# Number of page ranges handed out per worker, so one slow chunk doesn't
+# leave the rest of the pool idle at the end of the run
+CHUNKS_PER_WORKER = 4
+
+
+def new_page_state():
+    return {key: INHERIT for key in STATE_KEYS}
+
+
+def resolve_rows(page_results, state=None, metrics=None):
+    """Merge per-page (rows, state, page_stats) results in page order into final CSV rows.
+
+    Produces exactly what a single serial pass over all pages would have produced.
+    Rows dropped for lack of a college / course are counted in metrics, if given.
+
+    Rows are resolved in place and yielded as CutoffRows. Headings and strings
+    that arrive as separate copies (from pool workers or the page cache) are
+    swapped for one shared instance, so sinks holding on to them keep one copy.
+    """
+    state = dict(state) if state else {key: None for key in STATE_KEYS}
+    shared = {}
+
+    for rows, page_state, _ in page_results:
+        for row in rows:
+            college = state["college"] if row.college == INHERIT else row.college
+            course = state["course"] if row.course == INHERIT else row.course
+            seat_type = state["seat_type"] if row.seat_type == INHERIT else row.seat_type
+
+            # The page emitted this row assuming an inherited college/course existed
+            if not (college and course):
+                if metrics is not None:
+                    metrics.drop(UNRESOLVED_HEADING)
+                continue
+
+            seat_type = seat_type or "Unknown"
+            row.college = shared.setdefault(college, college)
+            row.course = shared.setdefault(course, course)
+            row.seat_type = shared.setdefault(seat_type, seat_type)
+            row.category = shared.setdefault(row.category, row.category)
+            yield row
+
+        for key in STATE_KEYS:
+            if page_state[key] != INHERIT:
+                state[key] = page_state[key]
+
+
+def resolve_workers(workers):
+    """--workers 0 means one worker per core."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def split_page_range(total_pages, workers):
+    """Split [0, total_pages) into contiguous (start, end) chunks."""
+    chunk_count = min(total_pages, workers * CHUNKS_PER_WORKER)
+    if chunk_count <= 0:
+        return []
+
+    base, extra = divmod(total_pages, chunk_count)
+    chunks = []
+    start = 0
+    for idx in range(chunk_count):
+        end = start + base + (1 if idx < extra else 0)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def page_text(page):
+    """Default page extractor: the page's extract_text() layout."""
+    return page.extract_text()
+
+
+def _parse_page(page, parse_page, extract, cache, samples, prune):
+    """parse_page(extract(page)) for one pdfplumber page, going through the page cache if there is one.
+
+    samples maps the page numbers the samplers read to their known
+    extract_text() (None when not known yet). Known text is parsed as is;
+    text extracted here for such a page is handed back for the SampleCache.
+
+    With prune, pages the pre-scan (page_prescan.py) finds no cutoffs or
+    headings on are not extracted or parsed at all: they count as pruned and
+    come back empty.
+
+    Returns (result, info); info has cache_hit, pruned, sample_text and the
+    extract_s / parse_s seconds spent on the page.
+    """
+    info = {"cache_hit": False, "pruned": False, "sample_text": None, "extract_s": 0.0, "parse_s": 0.0}
+    started = time.perf_counter()
+
+    if prune and not may_have_rows(page):
+        info["pruned"] = True
+        info["extract_s"] = time.perf_counter() - started
+        return ([], new_page_state(), new_page_stats()), info
+
+    key = None
+    if cache is not None:
+        key = cache.key(page)
+        result = cache.get(key)
+        if result is not None:
+            info["cache_hit"] = True
+            info["extract_s"] = time.perf_counter() - started
+            return result, info
+
+    number = page.page_number - 1
+    if samples.get(number) is not None:
+        data = samples[number]
+    else:
+        data = extract(page)
+        if number in samples:
+            info["sample_text"] = data
+    extracted = time.perf_counter()
+
+    result = parse_page(data)
+    info["extract_s"] = extracted - started
+    info["parse_s"] = time.perf_counter() - extracted
+
+    if cache is not None:
+        cache.put(key, result)
+    return result, info
+
+
+def _parse_page_range(args):
+    # Runs inside a pool worker: every worker opens its own pdfplumber handle
+    pdf_path, start, end, parse_page, extract, cache, samples, prune = args
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_parse_page(pdf.pages[n], parse_page, extract, cache, samples, prune) for n in range(start, end)]
+
+
+def iter_page_results(pdf_path, parse_page, workers=1, executor=None, page_cache=None, metrics=None,
+                      desc="Processing pages", extract=page_text, prune=True, sample_cache=None):
+    """Yield parse_page(extract(page)) for every page of the PDF, in page order.
+
+    With workers > 1 the page range is split across a process pool; results
+    still come back in page order so resolve_rows() sees the same sequence.
+    A long-lived caller (parser_daemon.py) can pass its own warm executor.
+
+    page_cache is a directory for PageCache; pages whose content stream was
+    parsed before are not extracted again. The same directory holds the SampleCache:
+    pages analyze-pdf / debug-pdf already extracted are not extracted again,
+    and the text of sampled pages extracted here is kept for them. A
+    sample_cache the caller already read pages through (detect_strategy())
+    is used instead, so those pages aren't extracted twice either.
+
+    extract turns a pdfplumber page into parse_page's input (extract_text() by
+    default); it must be a module-level function so pool workers can run it.
+    prune=False parses every page, including those the pre-scan would skip.
+
+    Per-page timings, line counts and dropped rows go into metrics (a
+    ParseMetrics) when one is passed. A tqdm bar goes to stderr unless
+    metrics reports progress records instead.
+    """
+    if executor is None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from submit_page_results(pdf_path, parse_page, executor, workers, page_cache, metrics, desc,
+                                           extract, prune, sample_cache)
+        return
+
+    yield from submit_page_results(pdf_path, parse_page, executor, workers, page_cache, metrics, desc, extract,
+                                   prune, sample_cache)
+
+
+def submit_page_results(pdf_path, parse_page, executor=None, workers=1, page_cache=None, metrics=None,
+                        desc="Processing pages", extract=page_text, prune=True, sample_cache=None):
+    """Start parsing pdf_path and return an iterator over its page results, in page order.
+
+    Same results as iter_page_results(), but with an executor the page chunks
+    are submitted before this returns, not when the iterator is first read. A
+    caller can queue several PDFs on one pool (batch_parse.py) and keep it busy
+    while it is still writing out an earlier one. Without an executor pages are
+    parsed in this process as the iterator is read.
+    """
+    cache = PageCache(page_cache, parse_page) if page_cache else None
+    # Sampled text is extract_text() output, so only text parsers can share it
+    if extract is not page_text:
+        sample_cache = None
+    elif sample_cache is None and page_cache:
+        sample_cache = SampleCache(page_cache, pdf_path)
+    metrics = metrics if metrics is not None else ParseMetrics()
+
+    with metrics.phase("open"):
+        pdf = pdfplumber.open(pdf_path)
+        total_pages = len(pdf.pages)
+    print(f"Total pages: {total_pages}")
+    metrics.total_pages = total_pages
+    show_bar = metrics.progress is None
+
+    samples = {}
+    if sample_cache is not None:
+        samples = sample_cache.known_texts(parse_sampled_page_numbers(total_pages))
+
+    if executor is None:
+        page_results = _iter_serial_pages(pdf, parse_page, extract, cache, samples, prune, desc, show_bar)
+    else:
+        pdf.close()
+        page_results = _submit_chunks(executor, pdf_path, total_pages, workers, parse_page, extract, cache, samples,
+                                      prune, desc, show_bar)
+    return _collect_page_results(page_results, cache, sample_cache, metrics)
+
+
+def _collect_page_results(page_results, cache, sample_cache, metrics):
+    for number, (result, info) in enumerate(page_results):
+        metrics.add_page(number, info, result[2], len(result[0]))
+        if info["sample_text"] is not None:
+            sample_cache.add_text(number, info["sample_text"])
+        yield result
+
+    pruned = sum(1 for page in metrics.pages if page["pruned"])
+    print(f"Pruned pages: {pruned} of {len(metrics.pages)} (no Stage blocks or headings)")
+    if cache is not None:
+        hits = sum(1 for page in metrics.pages if page["cacheHit"])
+        print(f"Page cache: {hits} reused, {len(metrics.pages) - hits - pruned} extracted")
+    if sample_cache is not None:
+        sample_cache.save()
+
+
+def _iter_serial_pages(pdf, parse_page, extract, cache, samples, prune, desc, show_bar):
+    with pdf:
+        for page in tqdm(pdf.pages, desc=desc, disable=not show_bar):
+            yield _parse_page(page, parse_page, extract, cache, samples, prune)
+
+
+def _submit_chunks(executor, pdf_path, total_pages, workers, parse_page, extract, cache, samples, prune, desc,
+                   show_bar):
+    chunks = split_page_range(total_pages, workers)
+    print(f"Workers: {workers} ({len(chunks)} page chunks)")
+
+    futures = [
+        executor.submit(_parse_page_range, (
+            pdf_path, start, end, parse_page, extract, cache,
+            {number: text for number, text in samples.items() if start <= number < end}, prune
+        ))
+        for start, end in chunks
+    ]
+    return _iter_chunk_results(futures, total_pages, desc, show_bar)
+
+
+def _iter_chunk_results(futures, total_pages, desc, show_bar):
+    try:
+        with tqdm(total=total_pages, desc=desc, disable=not show_bar) as progress:
+            for future in futures:
+                chunk_results = future.result()
+                progress.update(len(chunk_results))
+                yield from chunk_results
+    finally:
+        # Abandoned part way (an error, or the reader stopped): drop chunks not started yet
+        for future in futures:
+            future.cancel()
+
+
+def write_rows_csv(rows, output_csv, keep_empty=True, sinks=(), metrics=None):
+    """Stream rows into output_csv and return a summary of what was written.
+
+    Rows are written as they arrive, so memory stays flat however big the PDF
+    is. The file is written next to output_csv and moved into place at the end,
+    so readers never see a half-written CSV. With keep_empty=False nothing is
+    left behind when there are no rows.
+
+    Each sink gets add(row) for every row and close(summary) once the CSV is
+    in place, so extra outputs are built in the same pass.
+
+    With metrics, time spent writing (not waiting for rows) and the number of
+    rows written are recorded.
+    """
+    tmp_path = f"{output_csv}.tmp"
+    record_count = 0
+    colleges = set()
+    courses = set()
+    sample = []
+    write_s = 0.0
+
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            # Same dialect pandas' to_csv used to produce
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(CSV_COLUMNS)
+            for row in rows:
+                started = time.perf_counter()
+                writer.writerow(row.csv_values())
+                record_count += 1
+                colleges.add(row.college.code)
+                courses.add(row.course.code)
+                if len(sample) < SAMPLE_ROWS:
+                    sample.append(row.as_dict())
+                for sink in sinks:
+                    sink.add(row)
+                write_s += time.perf_counter() - started
+            csv_bytes = f.tell()
+    except BaseException:
+        # Not there when open() itself failed; the original error is the one to see
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+    summary = {
+        "output_csv": output_csv,
+        "record_count": record_count,
+        "csv_bytes": csv_bytes,
+        "unique_colleges": len(colleges),
+        "unique_courses": len(courses),
+        "sample_rows": sample
+    }
+
+    started = time.perf_counter()
+    if not record_count and not keep_empty:
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, output_csv)
+        for sink in sinks:
+            sink.close(summary)
+
+    if metrics is not None:
+        metrics.phases["write"] += write_s + time.perf_counter() - started
+        metrics.rows_emitted = record_count
+    return summary
+
+
+def format_sample(rows):
+    """Right-aligned plain-text table of a few rows, with a row index column."""
+    table = [[""] + CSV_COLUMNS]
+    table += [[str(idx)] + [str(row[column]) for column in CSV_COLUMNS] for idx, row in enumerate(rows)]
+    widths = [max(len(line[col]) for line in table) for col in range(len(table[0]))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in table)
+
+
+def print_summary(summary):
+    print(f"\n[SUCCESS] Saved: {summary['output_csv']}")
+    print(f"Total rows: {summary['record_count']}")
+    print(f"Unique colleges: {summary['unique_colleges']}")
+    print(f"Unique courses: {summary['unique_courses']}")
+    print(f"\nSample data:")
+    print(format_sample(summary["sample_rows"]))
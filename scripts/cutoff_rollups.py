@@ -0,0 +1,290 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import threading
+from contextlib import suppress
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from cutoff_rows import Heading, make_row
+
+# Bump when the layout below changes so stale readers fall back to the CSVs
+ROLLUPS_VERSION = 2
+
+# Order of the values in every stats list of the rollups file. "first" is what
+# the trend routes' CSV scan answers with (the key's first row in the round),
+# "last" the key's last row
+STATS_FIELDS = ["minRank", "maxRank", "lastRank", "minPercentile", "maxPercentile", "lastPercentile",
+                "firstRank", "firstPercentile"]
+(MIN_RANK, MAX_RANK, LAST_RANK, MIN_PERCENTILE, MAX_PERCENTILE, LAST_PERCENTILE,
+ FIRST_RANK, FIRST_PERCENTILE) = range(len(STATS_FIELDS))
+
+# Keys are college_code|course_code|category|seat_type
+KEY_SEPARATOR = "|"
+
+exam_round_pattern = re.compile(r"^(?P<family>.+)-round-(?P<round>\d+)$")
+
+# One rollups file is shared by every round of an exam, so merges into it are
+# serialised: between threads of a process (the daemon) by _merge_lock, and
+# between processes (a CLI --rollups run next to the daemon) by a lock file
+_merge_lock = threading.Lock()
+
+
+def exam_family(exam_id):
+    """mht-cet-mh-cap-round-2 -> mht-cet-mh-cap"""
+    match = exam_round_pattern.match(exam_id)
+    return match.group("family") if match else exam_id
+
+
+def exam_round(exam_id):
+    """mht-cet-mh-cap-round-2 -> round2 (None when the exam id has no round)"""
+    match = exam_round_pattern.match(exam_id)
+    return f"round{match.group('round')}" if match else None
+
+
+def rollups_path(directory, exam_id):
+    return os.path.join(directory, f"rollups_{exam_family(exam_id)}.json")
+
+
+def rollup_key(row):
+    return KEY_SEPARATOR.join((row.college.code, row.course.code, row.category, row.seat_type))
+
+
+def _round_number(round_name):
+    return int(round_name[len("round"):]) if round_name[len("round"):].isdigit() else 0
+
+
+def _fold(stats, rank, percentile):
+    """Fold one (rank, percentile) into a stats list, or start one."""
+    if stats is None:
+        return [rank, rank, rank, percentile, percentile, percentile, rank, percentile]
+    stats[MIN_RANK] = min(stats[MIN_RANK], rank)
+    stats[MAX_RANK] = max(stats[MAX_RANK], rank)
+    stats[LAST_RANK] = rank
+    stats[MIN_PERCENTILE] = min(stats[MIN_PERCENTILE], percentile)
+    stats[MAX_PERCENTILE] = max(stats[MAX_PERCENTILE], percentile)
+    stats[LAST_PERCENTILE] = percentile
+    return stats
+
+
+def _combine(stats_in_order):
+    """Year stats from its rounds' stats, earliest first: min / max over all, first of the first round, last of the last."""
+    combined = None
+    for stats in stats_in_order:
+        if combined is None:
+            combined = list(stats)
+            continue
+        combined[MIN_RANK] = min(combined[MIN_RANK], stats[MIN_RANK])
+        combined[MAX_RANK] = max(combined[MAX_RANK], stats[MAX_RANK])
+        combined[LAST_RANK] = stats[LAST_RANK]
+        combined[MIN_PERCENTILE] = min(combined[MIN_PERCENTILE], stats[MIN_PERCENTILE])
+        combined[MAX_PERCENTILE] = max(combined[MAX_PERCENTILE], stats[MAX_PERCENTILE])
+        combined[LAST_PERCENTILE] = stats[LAST_PERCENTILE]
+    return combined
+
+
+def load_rollups(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rollups = json.load(f)
+        if rollups.get("version") == ROLLUPS_VERSION:
+            return rollups
+    except (OSError, ValueError):
+        pass
+    return {"version": ROLLUPS_VERSION, "fields": STATS_FIELDS, "partitions": {}, "keys": {}}
+
+
+class _FileLock:
+    """Exclusive lock on <path>.lock, held across processes (a no-op where fcntl is missing)."""
+
+    def __init__(self, path):
+        self.path = f"{path}.lock"
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.file = open(self.path, "a")
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+
+
+def merge_partition(path, year, round_name, stats, names, first_rows):
+    """Replace one (year, round) partition of the rollups file at path.
+
+    stats maps key -> stats list for the partition, names maps key ->
+    (college_name, course_name) and first_rows maps key -> position of its
+    first row in the round's CSV (kept as the entry's "firstRows", so readers
+    can tell which of several name-matching keys the CSV lists first). Keys'
+    year stats are recomputed from their rounds, and keys left without any
+    round are dropped.
+    """
+    partition = f"{year}/{round_name}"
+
+    with _merge_lock, _FileLock(path):
+        rollups = load_rollups(path)
+        keys = rollups["keys"]
+
+        touched = set(stats)
+        for key, entry in keys.items():
+            entry["firstRows"].pop(partition, None)
+            if entry["rounds"].pop(partition, None) is not None:
+                touched.add(key)
+
+        for key, key_stats in stats.items():
+            college_name, course_name = names[key]
+            entry = keys.setdefault(key, {"college": college_name, "course": course_name, "rounds": {}, "years": {},
+                                          "firstRows": {}})
+            entry["college"] = college_name
+            entry["course"] = course_name
+            entry["rounds"][partition] = key_stats
+            entry["firstRows"][partition] = first_rows[key]
+
+        for key in touched:
+            entry = keys[key]
+            year_rounds = sorted(
+                (name for name in entry["rounds"] if name.startswith(f"{year}/")),
+                key=lambda name: _round_number(name.split("/", 1)[1])
+            )
+            if year_rounds:
+                entry["years"][year] = _combine(entry["rounds"][name] for name in year_rounds)
+            else:
+                entry["years"].pop(year, None)
+            if not entry["rounds"]:
+                del keys[key]
+
+        rounds = set(rollups["partitions"].get(year, []))
+        if stats:
+            rounds.add(round_name)
+        else:
+            rounds.discard(round_name)
+        if rounds:
+            rollups["partitions"][year] = sorted(rounds, key=_round_number)
+        else:
+            rollups["partitions"].pop(year, None)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(rollups, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+
+    print(f"Rollups: {path} ({len(stats)} keys for {partition})")
+
+
+class RollupWriter:
+    """Row sink that keeps per-key min / max / first / last rank and percentile for one (year, round).
+
+    Keys are (college_code, course_code, category, seat_type). Rows with
+    neither a rank nor a percentile are left out, as the trend routes' CSV
+    scan leaves them out. When the CSV
+    is in place the partition is merged into the exam's rollups file
+    (rollups_<exam family>.json), which holds every round and year parsed so
+    far, so the trend routes look keys up instead of scanning round CSVs.
+    """
+
+    def __init__(self, path, year, round):
+        self.path = path
+        self.year = str(year)
+        self.round = round
+        self.stats = {}
+        self.names = {}
+        self.first_rows = {}
+        self.row_count = 0
+
+    def add(self, row):
+        row_number = self.row_count
+        self.row_count += 1
+        if not row.rank and not row.percentile:
+            return
+
+        key = rollup_key(row)
+        stats = self.stats.get(key)
+        if stats is None:
+            self.names[key] = (row.college.name, row.course.name)
+            self.first_rows[key] = row_number
+        self.stats[key] = _fold(stats, row.rank, row.percentile)
+
+    def close(self, summary):
+        merge_partition(self.path, self.year, self.round, self.stats, self.names, self.first_rows)
+
+
+def add_rollup_arguments(parser):
+    """--rollups / --year / --round for a parser CLI."""
+    parser.add_argument("--rollups", metavar="PATH",
+                        help="Merge per-key min / max / last rank and percentile into this rollups file")
+    parser.add_argument("--year", help="Year of the PDF for --rollups (e.g. 2024-2025)")
+    parser.add_argument("--round", type=int, help="CAP round of the PDF for --rollups")
+
+
+def rollups_from_args(parser, args):
+    """parse_pdf()'s rollups argument from add_rollup_arguments() options, or None."""
+    if not args.rollups:
+        return None
+    if not args.year or args.round is None:
+        parser.error("--rollups needs --year and --round")
+    return {"path": args.rollups, "year": args.year, "round": f"round{args.round}"}
+
+
+def rollup_csv(csv_path, path, year, round_name):
+    """Fold an already parsed cutoff CSV into a rollups file."""
+    writer = RollupWriter(path, year, round_name)
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for values in csv.DictReader(f):
+            try:
+                rank = int(values["rank"])
+                percentile = float(values["percentile"])
+            except (TypeError, ValueError):
+                continue
+            writer.add(make_row(
+                Heading(values["college_code"], values["college_name"]),
+                Heading(values["course_code"], values["course_name"]),
+                values["seat_type"], values["category"], rank, percentile
+            ))
+    writer.close(None)
+
+
+def rollup_directory(directory):
+    """Rollups for every parsed exam in directory (public/), from its metadata and CSV."""
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith("_metadata.json"):
+            continue
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        exam_id = metadata.get("examId")
+        round_name = exam_round(exam_id or "")
+        csv_path = os.path.join(directory, f"cutoffs_{exam_id}.csv")
+        if not round_name or not metadata.get("year") or not os.path.exists(csv_path):
+            continue
+        rollup_csv(csv_path, rollups_path(directory, exam_id), metadata["year"], round_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build trend rollups from cutoff CSVs that are already parsed")
+    parser.add_argument("directory", help="Directory with cutoffs_<examId>.csv and <examId>_metadata.json (public/)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"[ERROR] Not a directory: {args.directory}")
+        sys.exit(1)
+    rollup_directory(args.directory)
+
+
+if __name__ == "__main__":
+    main()
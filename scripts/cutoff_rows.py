@@ -0,0 +1,89 @@
+import sys
+from collections import namedtuple
+
+CSV_COLUMNS = ['college_code', 'college_name', 'course_code', 'course_name', 'seat_type', 'category', 'rank', 'percentile']
+
+# A college or course heading. Page parsers make one per heading line and
+# every row under it points at that same tuple.
+Heading = namedtuple("Heading", ["code", "name"])
+
+
+class CutoffRow:
+    """One category's rank and percentile under a college / course / seat type.
+
+    A row holds references rather than copies of the names: college and course
+    are shared Heading tuples, seat type and category interned strings, and
+    __slots__ keeps the row itself to six pointers. CSV values are only spelled
+    out when the row is written (csv_values()).
+
+    college, course and seat_type are INHERIT until resolve_rows() fills them in.
+    """
+
+    __slots__ = ("college", "course", "seat_type", "category", "rank", "percentile")
+
+    def __init__(self, college, course, seat_type, category, rank, percentile):
+        self.college = college
+        self.course = course
+        self.seat_type = seat_type
+        self.category = category
+        self.rank = rank
+        self.percentile = percentile
+
+    def _values(self):
+        return (self.college, self.course, self.seat_type, self.category, self.rank, self.percentile)
+
+    def __eq__(self, other):
+        if not isinstance(other, CutoffRow):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"CutoffRow{self._values()!r}"
+
+    def csv_values(self):
+        """The row's values in CSV_COLUMNS order (a resolved row only)."""
+        return (self.college.code, self.college.name, self.course.code, self.course.name,
+                self.seat_type, self.category, self.rank, self.percentile)
+
+    def as_dict(self):
+        return dict(zip(CSV_COLUMNS, self.csv_values()))
+
+
+def make_row(college, course, seat_type, category, rank, percentile):
+    # Category names repeat on every Stage line; keep one copy per process
+    return CutoffRow(college, course, seat_type, sys.intern(category), rank, percentile)
+
+
+def _encode_value(value):
+    return list(value) if isinstance(value, Heading) else value
+
+
+def _decode_value(value, headings):
+    if not isinstance(value, list):
+        return value
+    heading = Heading(*value)
+    return headings.setdefault(heading, heading)
+
+
+def encode_page_result(result):
+    """A page's (rows, state, page_stats) as plain JSON values, for the page cache."""
+    rows, state, page_stats = result
+    return [
+        [[_encode_value(value) for value in row._values()] for row in rows],
+        {key: _encode_value(value) for key, value in state.items()},
+        page_stats
+    ]
+
+
+def decode_page_result(data):
+    """Inverse of encode_page_result()."""
+    rows, state, page_stats = data
+    # Rows under the same heading share one Heading again
+    headings = {}
+    return (
+        [make_row(*(_decode_value(value, headings) for value in row)) for row in rows],
+        {key: _decode_value(value, headings) for key, value in state.items()},
+        page_stats
+    )
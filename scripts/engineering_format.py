@@ -0,0 +1,237 @@
+"""Page parsers for the engineering CAP layout (strategies "engineering_format" and "geometry_format").
+
+Each Stage line names the categories and is followed by their ranks and
+percentiles:
+
+    Stage GOPENS GSCS GSTS ...
+    I 34240 62739 91124 ...
+    (88.5013511) (77.8445199) (65.8812284) ...
+"""
+import re
+from functools import lru_cache
+
+from cutoff_rows import Heading, make_row
+from cutoff_pipeline import new_page_state
+from geometry_engine import group_lines, line_text, read_stage_table
+from line_classifier import COLLEGE, COURSE, RANKS, SEAT_TYPE, STAGE, classify_line
+from parse_metrics import (
+    COUNT_MISMATCH, NO_PERCENTILE, NO_PERCENTILE_LINE, NO_RANK_LINE, UNRECOGNISED_HEADING, UNRESOLVED_HEADING, count,
+    new_page_stats
+)
+
+college_pattern = re.compile(r"^(\d+)\s*-\s*(.+)$")
+# Some course codes end in letters: "0302524270U - Computer Science and Engineering"
+course_pattern = re.compile(r"^(\d+[A-Z]*)\s*-\s*(.+)$")
+stage_pattern = re.compile(r"^Stage\s+(.+)$")
+rank_line_pattern = re.compile(r"^I\s+(.+)$")
+percentile_pattern = re.compile(r"\(([\d.]+)\)")
+rank_number_pattern = re.compile(r"\b(\d+)\b")
+
+
+@lru_cache(maxsize=64)
+def engineering_seat_type(line):
+    """Seat type named on a SEAT_TYPE line of an engineering page, or None to keep the current one."""
+    if "State Level" in line and "Stage" not in line:
+        return "State Level"
+    elif "Home University Seats Allotted to Home University Candidates" in line:
+        return "Home University Seats Allotted to Home University Candidates"
+    elif "Home University Seats Allotted to Other Than Home University Candidates" in line:
+        return "Home University Seats Allotted to Other Than Home University Candidates"
+    elif "Other Than Home University Seats Allotted to Other Than Home University Candidates" in line:
+        return "Other Than Home University Seats Allotted to Other Than Home University Candidates"
+    return None
+
+
+def engineering_college(line):
+    """Heading for an engineering college heading line, or None."""
+    college_match = college_pattern.match(line)
+    if college_match:
+        code = college_match.group(1)
+        name = college_match.group(2).strip()
+        # College codes are 3-5 digits; names are too varied to check ("... Technical
+        # Campus", "... Group of Institutions")
+        if 3 <= len(code) <= 5:
+            return Heading(code, name)
+    return None
+
+
+def engineering_course(line):
+    """Heading for an engineering course heading line, or None."""
+    course_match = course_pattern.match(line)
+    if course_match:
+        code = course_match.group(1)
+        name = course_match.group(2).strip()
+        # Course codes are 8-10 digits, sometimes plus letters; names are too varied to
+        # check ("Electronics and Telecommunication Engg", "Artificial Intelligence and Data Science")
+        if len(code) >= 8:
+            return Heading(code, name)
+    return None
+
+
+def engineering_heading(line_type, line, college, course):
+    """(college, course, line type to count) after a COLLEGE or COURSE line.
+
+    A new college resets the course. A line that only looks like a heading
+    ("12 - note") keeps both and is counted as UNRECOGNISED_HEADING.
+    """
+    if line_type == COLLEGE:
+        heading = engineering_college(line)
+        if heading is not None:
+            return heading, None, line_type
+    else:
+        heading = engineering_course(line)
+        if heading is not None:
+            return college, heading, line_type
+    return college, course, UNRECOGNISED_HEADING
+
+
+def sniff(lines):
+    """True when a page's stripped lines have a Stage line with its (bare) rank line right under it."""
+    return any(stage_pattern.match(line) and classify_line(next_line) == RANKS
+               for line, next_line in zip(lines, lines[1:]))
+
+
+def parse_page_text(text):
+    """Parse one page of extract_text() output.
+
+    Returns (rows, state, page_stats): the rows found on the page, the college /
+    course / seat type in effect at the end of it, and line / dropped-row counts
+    (parse_metrics). Anything not set on this page stays INHERIT and is filled
+    in from earlier pages by resolve_rows().
+
+    Every line is classified once (line_classifier) and only the checks for its
+    type run.
+    """
+    rows = []
+    state = new_page_state()
+    page_stats = new_page_stats()
+    if not text:
+        return rows, state, page_stats
+
+    current_college = state["college"]
+    current_course = state["course"]
+    current_seat_type = state["seat_type"]
+
+    lines = text.split("\n")
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if not line:
+            i += 1
+            continue
+
+        line_type = classify_line(line)
+
+        if line_type == COLLEGE or line_type == COURSE:
+            # 🏫 College (format: "1002 - Government College of Engineering, Amravati")
+            # or 📘 course (format: "100219110 - Civil Engineering") detection
+            current_college, current_course, line_type = engineering_heading(
+                line_type, line, current_college, current_course
+            )
+
+        elif line_type == SEAT_TYPE:
+            # 🪑 Seat Type detection
+            current_seat_type = engineering_seat_type(line) or current_seat_type
+
+        elif line_type == STAGE:
+            # 📊 Stage line detection (contains categories)
+            stage_match = stage_pattern.match(line)
+            if stage_match and not (current_college and current_course):
+                count(page_stats["dropped"], UNRESOLVED_HEADING, len(stage_match.group(1).split()))
+            elif stage_match:
+                categories = stage_match.group(1).split()
+                emitted = len(rows)
+                dropped_reason = NO_RANK_LINE
+
+                # Look for rank line (next line starting with "I")
+                if i + 1 < len(lines):
+                    rank_line = lines[i + 1].strip()
+                    rank_match = rank_line_pattern.match(rank_line)
+
+                    if rank_match:
+                        rank_numbers = rank_number_pattern.findall(rank_match.group(1))
+                        dropped_reason = NO_PERCENTILE_LINE
+
+                        # Look for percentile line (line after rank line)
+                        if i + 2 < len(lines):
+                            percentile_line = lines[i + 2].strip()
+                            percentiles = percentile_pattern.findall(percentile_line)
+                            dropped_reason = COUNT_MISMATCH
+
+                            # Match categories with ranks and percentiles by index
+                            for idx, category in enumerate(categories):
+                                if idx < len(rank_numbers) and idx < len(percentiles):
+                                    rows.append(make_row(
+                                        current_college,
+                                        current_course,
+                                        current_seat_type,
+                                        category,
+                                        int(rank_numbers[idx]),
+                                        float(percentiles[idx])
+                                    ))
+
+                count(page_stats["dropped"], dropped_reason, len(categories) - (len(rows) - emitted))
+
+        count(page_stats["lines"], line_type)
+        i += 1
+
+    state["college"] = current_college
+    state["course"] = current_course
+    state["seat_type"] = current_seat_type
+    return rows, state, page_stats
+
+
+def parse_page_words(words):
+    """Parse one page of geometry_engine.page_words() output (strategy "geometry_format").
+
+    Same headings and seat types as the text parser, but Stage tables are read
+    by column position (geometry_engine.read_stage_table), so empty columns
+    and wrapped lines no longer drop or misassign rows.
+    """
+    rows = []
+    state = new_page_state()
+    page_stats = new_page_stats()
+
+    current_college = state["college"]
+    current_course = state["course"]
+    current_seat_type = state["seat_type"]
+
+    lines = group_lines(words)
+    texts = [line_text(line) for line in lines]
+    line_types = [classify_line(text) for text in texts]
+    # line_types stays as classified for read_stage_table(); unrecognised headings are counted apart
+    counted_types = list(line_types)
+    i = 0
+
+    while i < len(lines):
+        line = texts[i]
+        line_type = line_types[i]
+
+        if line_type == COLLEGE or line_type == COURSE:
+            current_college, current_course, counted_types[i] = engineering_heading(
+                line_type, line, current_college, current_course
+            )
+
+        elif line_type == SEAT_TYPE:
+            current_seat_type = engineering_seat_type(line) or current_seat_type
+
+        elif line_type == STAGE:
+            table, unpaired, i = read_stage_table(lines, i, line_types)
+            if not (current_college and current_course):
+                count(page_stats["dropped"], UNRESOLVED_HEADING, len(table) + unpaired)
+                continue
+            for category, rank, percentile in table:
+                rows.append(make_row(current_college, current_course, current_seat_type, category, rank, percentile))
+            count(page_stats["dropped"], NO_PERCENTILE, unpaired)
+            continue
+
+        i += 1
+
+    for line_type in counted_types:
+        count(page_stats["lines"], line_type)
+    state["college"] = current_college
+    state["course"] = current_course
+    state["seat_type"] = current_seat_type
+    return rows, state, page_stats
@@ -0,0 +1,66 @@
+import pdfplumber
+import sys
+import json
+
+from sample_cache import SampleCache
+
+
+def extract_detailed_sample(pdf_path, sample_pages=10, page_cache=None):
+    """Longer per-page samples plus table detection, for the debug-pdf analysis.
+
+    page_cache works as in extract_sample(); table counts are cached too.
+    """
+    cache = SampleCache(page_cache, pdf_path) if page_cache else None
+    read_text = cache.text if cache else lambda page: page.extract_text()
+    count_tables = cache.table_count if cache else lambda page: len(page.extract_tables())
+
+    with pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+        pages_to_read = min(sample_pages, total_pages)
+        
+        text_samples = []
+        structure_info = []
+        
+        for i in range(pages_to_read):
+            page = pdf.pages[i]
+            text = read_text(page)
+            if text:
+                # Get more text from each page (first 3000 chars)
+                text_samples.append(f"=== PAGE {i+1} ===\n{text[:3000]}")
+                
+                # Try to extract tables if any
+                table_count = count_tables(page)
+                if table_count:
+                    structure_info.append(f"Page {i+1}: Found {table_count} table(s)")
+        
+        # Get middle and last pages
+        if total_pages > pages_to_read * 2:
+            mid_page = pdf.pages[total_pages // 2]
+            mid_text = read_text(mid_page)
+            if mid_text:
+                text_samples.append(f"=== PAGE {total_pages // 2 + 1} (MIDDLE) ===\n{mid_text[:3000]}")
+        
+        if total_pages > pages_to_read:
+            last_page = pdf.pages[-1]
+            last_text = read_text(last_page)
+            if last_text:
+                text_samples.append(f"=== PAGE {total_pages} (LAST) ===\n{last_text[:3000]}")
+
+    if cache:
+        cache.save()
+    return {
+        "text": "\n\n--- PAGE BREAK ---\n\n".join(text_samples),
+        "total_pages": total_pages,
+        "structure_info": structure_info
+    }
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1]
+    sample_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    try:
+        print(json.dumps(extract_detailed_sample(pdf_path, sample_pages)))
+    except Exception as e:
+        print(json.dumps({"error": str(e), "text": "", "total_pages": 0, "structure_info": []}))
+        sys.exit(1)
@@ -1,10 +1,18 @@
 import pdfplumber
 import sys
 
-pdf_path = sys.argv[1]
-sample_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+from sample_cache import SampleCache
+
+
+def extract_sample(pdf_path, sample_pages=5, page_cache=None):
+    """Text from the first few pages plus the middle and last page, for analyze-pdf.
+
+    With page_cache (a directory) page text is shared with debug-pdf and the
+    parse through SampleCache, so no step extracts the same page twice.
+    """
+    cache = SampleCache(page_cache, pdf_path) if page_cache else None
+    read_text = cache.text if cache else lambda page: page.extract_text()
 
-try:
     with pdfplumber.open(pdf_path) as pdf:
         total_pages = len(pdf.pages)
         pages_to_read = min(sample_pages, total_pages)
@@ -12,24 +20,33 @@ try:
         text_samples = []
         for i in range(pages_to_read):
             page = pdf.pages[i]
-            text = page.extract_text()
+            text = read_text(page)
             if text:
                 text_samples.append(text[:2000])
         
         if total_pages > pages_to_read * 2:
             mid_page = pdf.pages[total_pages // 2]
-            mid_text = mid_page.extract_text()
+            mid_text = read_text(mid_page)
             if mid_text:
                 text_samples.append(mid_text[:2000])
         
         if total_pages > pages_to_read:
             last_page = pdf.pages[-1]
-            last_text = last_page.extract_text()
+            last_text = read_text(last_page)
             if last_text:
                 text_samples.append(last_text[:2000])
-        
-        result = "\n\n--- PAGE BREAK ---\n\n".join(text_samples)
-        print(result)
-except Exception as e:
-    print(f"ERROR: {str(e)}", file=sys.stderr)
-    sys.exit(1)
+
+    if cache:
+        cache.save()
+    return "\n\n--- PAGE BREAK ---\n\n".join(text_samples)
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1]
+    sample_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    try:
+        print(extract_sample(pdf_path, sample_pages))
+    except Exception as e:
+        print(f"ERROR: {str(e)}", file=sys.stderr)
+        sys.exit(1)
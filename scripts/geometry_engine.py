@@ -0,0 +1,157 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+from line_classifier import COLLEGE, COURSE, SEAT_TYPE, STAGE
+
+# Reads engineering cutoff tables from word positions instead of extract_text()
+# lines (parsing_strategy "geometry_format"). A Stage table is laid out as
+#
+#   Stage   GOPENS   GSCS    ...   EWS          <- header, one category per column
+#     I     33717    61041   ...   115797       <- rank row, one cell per filled column
+#           (88.60)  (78.56) ...   (53.74)      <- percentile row
+#   I-Non                   33345               <- later stage rows fill columns
+#    PWD                   (88.69)                 stage I left empty
+#
+# so every cell is bucketed into the column whose header sits above it. Empty
+# columns, wrapped header words ("PWDROBC" / "S") and extra stage rows no
+# longer shift values onto the wrong category.
+
+# Words whose tops are this close (in points) belong to the same line
+LINE_TOLERANCE = 3
+
+# A header word wrapped onto its own line sits at most this far below the header
+HEADER_WRAP_GAP = 12
+
+# Lines of these types always start something new, wherever their words sit
+HEADING_TYPES = (COLLEGE, COURSE, SEAT_TYPE, STAGE)
+
+rank_cell_pattern = re.compile(r"^\d+$")
+percentile_cell_pattern = re.compile(r"^\(([\d.]+)\)$")
+
+
+def page_words(page):
+    """Word boxes of a pdfplumber page, as plain dicts that pickle cheaply."""
+    return [
+        {"text": word["text"], "x0": word["x0"], "x1": word["x1"], "top": word["top"]}
+        for word in page.extract_words()
+    ]
+
+
+def group_lines(words):
+    """Cluster words into lines by their top, each line sorted left to right."""
+    lines = []
+    line = []
+    line_top = None
+    for word in sorted(words, key=lambda word: word["top"]):
+        if line and word["top"] - line_top > LINE_TOLERANCE:
+            lines.append(sorted(line, key=lambda word: word["x0"]))
+            line = []
+        if not line:
+            line_top = word["top"]
+        line.append(word)
+    if line:
+        lines.append(sorted(line, key=lambda word: word["x0"]))
+    return lines
+
+
+def line_text(line):
+    return " ".join(word["text"] for word in line)
+
+
+def _centre(word):
+    return (word["x0"] + word["x1"]) / 2
+
+
+@lru_cache(maxsize=256)
+def column_bounds(stage_x1, header_centres):
+    """x boundaries for a Stage header layout, as (label_edge, column_edges).
+
+    Anything left of label_edge is the stage label ("I", "I-Non PWD", "VII");
+    column_edges are the midpoints between neighbouring header centres, so
+    bisect_right(column_edges, x) is the column index of a cell centred at x.
+    Most tables on a PDF share a handful of layouts, so this is cached per layout.
+    """
+    label_edge = (stage_x1 + header_centres[0]) / 2
+    column_edges = tuple((left + right) / 2 for left, right in zip(header_centres, header_centres[1:]))
+    return label_edge, column_edges
+
+
+def _bucket(line, label_edge, column_edges):
+    """{column index: cell text} for the words of line right of the label zone."""
+    cells = {}
+    for word in line:
+        centre = _centre(word)
+        if centre < label_edge:
+            continue
+        column = bisect_right(column_edges, centre)
+        cells[column] = f"{cells[column]}{word['text']}" if column in cells else word["text"]
+    return cells
+
+
+def read_stage_table(lines, start, line_types):
+    """Read the Stage table whose header is lines[start]; line_types are the lines' classify_line() types.
+
+    Returns ([(category, rank, percentile), ...] in header order, number of
+    columns that had a rank but never a percentile, index of the first line
+    after the table). A column takes its values from the first stage row that
+    fills it; cells without both a rank and a percentile are skipped, as the
+    text parser does.
+    """
+    header = lines[start]
+    stage_word, header_words = header[0], header[1:]
+    end = start + 1
+    if stage_word["text"] != "Stage" or not header_words:
+        return [], 0, end
+
+    categories = [word["text"] for word in header_words]
+    label_edge, column_edges = column_bounds(
+        round(stage_word["x1"], 1), tuple(round(_centre(word), 1) for word in header_words)
+    )
+
+    ranks = {}
+    percentiles = {}
+    ranked_columns = set()
+    pending_ranks = None
+    last_top = header[0]["top"]
+
+    while end < len(lines):
+        line = lines[end]
+        if line_types[end] in HEADING_TYPES:
+            break
+
+        cells = _bucket(line, label_edge, column_edges)
+
+        if not cells:
+            # Stage label on a line of its own ("PWD" under "I-Non")
+            end += 1
+            continue
+
+        values = cells.values()
+        if all(rank_cell_pattern.match(value) for value in values):
+            pending_ranks = cells
+            ranked_columns.update(cells)
+        elif all(percentile_cell_pattern.match(value) for value in values):
+            if pending_ranks is not None:
+                for column, rank in pending_ranks.items():
+                    percentile = percentile_cell_pattern.match(cells.get(column, ""))
+                    if percentile and column not in ranks:
+                        ranks[column] = int(rank)
+                        percentiles[column] = float(percentile.group(1))
+                pending_ranks = None
+        elif pending_ranks is None and not ranks and line[0]["top"] - last_top <= HEADER_WRAP_GAP:
+            # Header word wrapped onto the next line
+            for column, text in cells.items():
+                categories[column] += text
+        else:
+            break
+
+        last_top = line[0]["top"]
+        end += 1
+
+    table = [
+        (category, ranks[column], percentiles[column])
+        for column, category in enumerate(categories)
+        if column in ranks
+    ]
+    return table, len(ranked_columns) - len(ranks), end
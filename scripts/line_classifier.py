@@ -0,0 +1,46 @@
+import re
+
+COLLEGE = "COLLEGE"
+COURSE = "COURSE"
+SEAT_TYPE = "SEAT_TYPE"
+STAGE = "STAGE"
+RANKS = "RANKS"
+PERCENTILES = "PERCENTILES"
+OTHER = "OTHER"
+
+LINE_TYPES = (COLLEGE, COURSE, SEAT_TYPE, STAGE, RANKS, PERCENTILES, OTHER)
+
+# One alternation matched once at the start of every stripped line; the name of
+# the group that matched is the line type, and earlier alternatives win.
+# Classification is deliberately loose: it only decides which checks a line
+# needs, and each format's handler still confirms with its own stricter pattern.
+#   COLLEGE      "1002 - Government College of Engineering, Amravati" (short code)
+#   COURSE       "0100219110 - Civil Engineering" (7+ digit code, sometimes with
+#                letters after it: "0302524270U - ...", "0110134310S - ...")
+#   STAGE        "Stage GOPENS GSCS ..." / "Stage I"
+#   RANKS        "I 33717 61041 ..." / "21655 42566 ..."
+#   PERCENTILES  "(88.6037289) (78.5613347) ..."
+#   SEAT_TYPE    "... Seats Allotted to ..." / "State Level" anywhere in the line
+LINE_PATTERN = re.compile(
+    r"(?P<COLLEGE>\d{1,6}\s*[-–])"
+    r"|(?P<COURSE>\d{7,}[A-Z]*\s*[-–])"
+    r"|(?P<STAGE>Stage)"
+    r"|(?P<RANKS>(?:I\s+)?\d+(?:\s+\d+)*$)"
+    r"|(?P<PERCENTILES>(?:\([\d.]+\)\s*)+$)"
+    r"|(?P<SEAT_TYPE>.*?(?:Seats Allotted|State Level))"
+)
+
+
+def classify_line(line):
+    """Line type of one stripped, non-empty line."""
+    match = LINE_PATTERN.match(line)
+    return match.lastgroup if match else OTHER
+
+
+def count_line_types(lines):
+    counts = dict.fromkeys(LINE_TYPES, 0)
+    for line in lines:
+        line = line.strip()
+        if line:
+            counts[classify_line(line)] += 1
+    return counts
@@ -0,0 +1,152 @@
+"""Page parser for the MBA CAP layout (strategy "mba_format", also used by MCA, BBA / BCA, HMCT and M.Arch PDFs).
+
+Categories come first, then their ranks, a Stage label and the percentiles:
+
+    GOPENH GSCH GSTH ...
+    3674 7527 14279 ...
+    Stage-I
+    (82.2152687) (60.5862256) (4.150835) ...
+"""
+import re
+from functools import lru_cache
+
+from cutoff_rows import Heading, make_row
+from cutoff_pipeline import new_page_state
+from line_classifier import COLLEGE, COURSE, PERCENTILES, SEAT_TYPE, classify_line
+from parse_metrics import count, new_page_stats
+
+mba_college_pattern = re.compile(r"^(\d+)\s*[-–]\s*(.+)$", re.IGNORECASE)
+mba_course_pattern = re.compile(r"^(\d{6,})\s*[-–]\s*(.+)$", re.IGNORECASE)
+mba_rank_pattern = re.compile(r"\b(\d+)\b")
+percentile_pattern = re.compile(r"\(([\d.]+)\)")
+category_code_pattern = re.compile(r'\b([A-Z]{3,8})\b')
+
+# Uppercase words on MBA pages that are not category codes
+NON_CATEGORY_WORDS = frozenset(['STAGE', 'STATUS', 'UNIVERSITY', 'DEPARTMENT', 'HOME', 'OTHER', 'THAN', 'ALLOTTED', 'CANDIDATES', 'LEVEL'])
+
+
+@lru_cache(maxsize=64)
+def mba_seat_type(line):
+    """Seat type named on a SEAT_TYPE line of an MBA page, or None to keep the current one."""
+    if "Home University Seats Allotted to Home University Candidates" in line:
+        return "Home University Seats Allotted to Home University Candidates"
+    elif "Other Than Home University Seats Allotted to Other Than Home University Candidates" in line:
+        return "Other Than Home University Seats Allotted to Other Than Home University Candidates"
+    elif "Other Than Home University Seats Allotted to Home University Candidates" in line:
+        return "Other Than Home University Seats Allotted to Home University Candidates"
+    elif "State Level" in line and "Seats" not in line:
+        return "State Level"
+    return None
+
+
+def sniff(lines):
+    """True when a page's stripped lines have a Stage label with the percentiles right under it."""
+    return any(line.startswith("Stage") and classify_line(next_line) == PERCENTILES
+               for line, next_line in zip(lines, lines[1:]))
+
+
+def parse_page_text(text):
+    """Parse one page of extract_text() output.
+
+    Returns (rows, state, page_stats) like engineering_format.parse_page_text();
+    state that is not set on this page stays INHERIT and is resolved across
+    pages by resolve_rows().
+    """
+    rows = []
+    state = new_page_state()
+    page_stats = new_page_stats()
+    if not text:
+        return rows, state, page_stats
+
+    current_college = state["college"]
+    current_course = state["course"]
+    current_seat_type = state["seat_type"]
+
+    lines = text.split("\n")
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if not line:
+            i += 1
+            continue
+
+        line_type = classify_line(line)
+        count(page_stats["lines"], line_type)
+
+        if line_type == COLLEGE:
+            # Try to detect MBA college pattern (format: "CODE - NAME")
+            mba_college_match = mba_college_pattern.match(line)
+            if mba_college_match:
+                code = mba_college_match.group(1)
+                name = mba_college_match.group(2).strip()
+                # MBA college codes are typically 4 digits
+                if len(code) <= 6:
+                    current_college = Heading(code, name)
+                    current_course = None
+                    current_seat_type = None
+
+        if line_type == COLLEGE or line_type == COURSE:
+            # Try to detect MBA course/program (format: "CODE - NAME")
+            # Course codes are longer (8-9 digits); a 6-digit code counts as both
+            mba_course_match = mba_course_pattern.match(line)
+            if mba_course_match:
+                code = mba_course_match.group(1)
+                name = mba_course_match.group(2).strip()
+                if len(code) >= 6:
+                    current_course = Heading(code, name)
+
+        elif line_type == SEAT_TYPE:
+            # Seat Type detection for MBA
+            current_seat_type = mba_seat_type(line) or current_seat_type
+
+        # MBA structure: Categories line -> Ranks line -> "Stage-I" -> Percentiles line
+        # Check if we have college and course, seat_type might be set on previous lines
+        if current_college and current_course:
+            # Look for categories line (contains category codes like GOPENH, GSCH, etc.)
+            # Category codes are typically uppercase letters, 3-8 chars, often starting with G, L, E, T, etc.
+            # Filter out common non-category words
+            filtered_categories = [cat for cat in category_code_pattern.findall(line)
+                                   if cat not in NON_CATEGORY_WORDS]
+
+            # If we found category codes, look for ranks and percentiles in next lines
+            if filtered_categories and len(filtered_categories) >= 2:
+                # Next line should have ranks (numbers)
+                if i + 1 < len(lines):
+                    ranks_line = lines[i + 1].strip()
+                    ranks = mba_rank_pattern.findall(ranks_line)
+
+                    # Look for "Stage-I" or "Stage" line
+                    percentiles_line_idx = i + 2
+
+                    if i + 2 < len(lines):
+                        next_line = lines[i + 2].strip()
+                        if "Stage" in next_line:
+                            percentiles_line_idx = i + 3
+
+                    # Percentiles are in parentheses on the line after Stage (or same line if no Stage)
+                    if percentiles_line_idx < len(lines):
+                        percentiles_line = lines[percentiles_line_idx].strip()
+                        percentiles = percentile_pattern.findall(percentiles_line)
+
+                        # Match categories with ranks and percentiles by index
+                        for idx, category in enumerate(filtered_categories):
+                            rank = int(ranks[idx]) if idx < len(ranks) and ranks[idx].isdigit() else 0
+                            percentile = float(percentiles[idx]) if idx < len(percentiles) else 0.0
+
+                            rows.append(make_row(
+                                current_college,
+                                current_course,
+                                current_seat_type,
+                                category,
+                                rank,
+                                percentile
+                            ))
+
+        i += 1
+
+    state["college"] = current_college
+    state["course"] = current_course
+    state["seat_type"] = current_seat_type
+    return rows, state, page_stats
@@ -0,0 +1,106 @@
+"""Page parser for the M.E. / M.Tech CAP layout (strategy "me_format").
+
+Each Stage line names the categories and the line under it has every
+category's merit number with its score in brackets:
+
+    Stage GOPENS GSCS GNT2S GOBCS
+    I 1217(15.72) 2729(10.17) 2408(11.17) 2645(10.48)
+
+The bracketed figure is the GATE / GPAT score (graduation marks for
+sponsored seats); it goes in the percentile column like the other layouts'
+bracketed figures.
+"""
+import re
+
+from cutoff_rows import make_row
+from cutoff_pipeline import new_page_state
+from engineering_format import engineering_heading, engineering_seat_type, stage_pattern
+from line_classifier import COLLEGE, COURSE, SEAT_TYPE, STAGE, classify_line
+from parse_metrics import COUNT_MISMATCH, NO_RANK_LINE, UNRESOLVED_HEADING, count, new_page_stats
+
+rank_line_pattern = re.compile(r"^I\s+(.+)$")
+merit_entry_pattern = re.compile(r"(\d+)\s*\(([\d.]+)\)")
+
+
+def sniff(lines):
+    """True when a page's stripped lines have a Stage line with merit(score) entries right under it."""
+    return any(stage_pattern.match(line) and rank_line_pattern.match(next_line)
+               and merit_entry_pattern.search(next_line)
+               for line, next_line in zip(lines, lines[1:]))
+
+
+def parse_page_text(text):
+    """Parse one page of extract_text() output.
+
+    Returns (rows, state, page_stats) like engineering_format.parse_page_text(),
+    whose college / course / seat type headings this layout shares.
+    """
+    rows = []
+    state = new_page_state()
+    page_stats = new_page_stats()
+    if not text:
+        return rows, state, page_stats
+
+    current_college = state["college"]
+    current_course = state["course"]
+    current_seat_type = state["seat_type"]
+
+    lines = text.split("\n")
+    i = 0
+
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if not line:
+            i += 1
+            continue
+
+        line_type = classify_line(line)
+
+        if line_type == COLLEGE or line_type == COURSE:
+            # Long course names wrap: "... with specialization in Artificial Intelligence [Non" / "Sponsored]"
+            if line_type == COURSE and line.count("[") > line.count("]") and i + 1 < len(lines):
+                i += 1
+                line = f"{line} {lines[i].strip()}"
+            current_college, current_course, line_type = engineering_heading(
+                line_type, line, current_college, current_course
+            )
+
+        elif line_type == SEAT_TYPE:
+            current_seat_type = engineering_seat_type(line) or current_seat_type
+
+        elif line_type == STAGE:
+            stage_match = stage_pattern.match(line)
+            if stage_match and not (current_college and current_course):
+                count(page_stats["dropped"], UNRESOLVED_HEADING, len(stage_match.group(1).split()))
+            elif stage_match:
+                categories = stage_match.group(1).split()
+                emitted = len(rows)
+                dropped_reason = NO_RANK_LINE
+
+                if i + 1 < len(lines):
+                    rank_match = rank_line_pattern.match(lines[i + 1].strip())
+                    if rank_match:
+                        entries = merit_entry_pattern.findall(rank_match.group(1))
+                        dropped_reason = COUNT_MISMATCH
+
+                        # Match categories with merit numbers and scores by index
+                        for category, (rank, score) in zip(categories, entries):
+                            rows.append(make_row(
+                                current_college,
+                                current_course,
+                                current_seat_type,
+                                category,
+                                int(rank),
+                                float(score)
+                            ))
+
+                count(page_stats["dropped"], dropped_reason, len(categories) - (len(rows) - emitted))
+
+        count(page_stats["lines"], line_type)
+        i += 1
+
+    state["college"] = current_college
+    state["course"] = current_course
+    state["seat_type"] = current_seat_type
+    return rows, state, page_stats
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from functools import partial
+
+from pdfminer.pdftypes import resolve1
+
+from cutoff_rows import decode_page_result, encode_page_result
+
+# Bump whenever any parse_page_text() changes what it returns, so cached pages
+# from the old logic are not reused
+PARSER_VERSION = 5
+
+
+def parser_tag(parse_page):
+    """Stable name for a page parser, including the options bound with partial()."""
+    if isinstance(parse_page, partial):
+        options = ",".join(f"{key}={value}" for key, value in sorted(parse_page.keywords.items()))
+        return f"{parser_tag(parse_page.func)}({options})"
+
+    module = parse_page.__module__
+    if module in ("__main__", "__mp_main__"):
+        # Same name whether the script runs directly or is imported by parser_daemon.py
+        module = os.path.splitext(os.path.basename(sys.modules[module].__file__))[0]
+    return f"{module}.{parse_page.__qualname__}"
+
+
+class PageCache:
+    """On-disk cache of parsed pages, keyed by the page's content stream.
+
+    A page's (rows, state, page_stats) result only depends on its own text,
+    so when an admin re-uploads a corrected PDF, every page whose content
+    stream is unchanged is served from here and only edited pages are
+    re-extracted.
+    """
+
+    def __init__(self, cache_dir, parse_page):
+        self.cache_dir = cache_dir
+        self.tag = parser_tag(parse_page)
+
+    def key(self, page):
+        digest = hashlib.sha256(f"{PARSER_VERSION}:{self.tag}".encode("utf-8"))
+        for stream in page.page_obj.contents:
+            digest.update(resolve1(stream).get_data())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return decode_page_result(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, key, result):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Several pool workers may write at once; never leave a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(encode_page_result(result), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
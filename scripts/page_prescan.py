@@ -0,0 +1,120 @@
+import re
+
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdftypes import PDFObjRef, PDFStream, dict_value, resolve1
+from pdfminer.psparser import LIT
+
+# The parts of a content stream that decide what text it shows, in stream order:
+# font selections ("/F1 9.5 Tf"), literal strings (one level of nested
+# parentheses, as PDF writers emit them) and hex strings (not "<<" dictionaries)
+content_pattern = re.compile(
+    rb"/(?P<font>[^\s/\[\]()<>{}%]+)\s+[-+\d.]+\s+Tf"
+    rb"|\((?P<literal>(?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*)\)"
+    rb"|<(?P<hex>[0-9A-Fa-f\s]*)>",
+    re.DOTALL
+)
+literal_escape_pattern = re.compile(rb"\\([0-7]{1,3}|\r\n|.)", re.DOTALL)
+# Inline image data is binary and can't be told apart from strings
+inline_image_pattern = re.compile(rb"(?:^|\s)BI\s")
+
+LITERAL_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"\n": b"", b"\r\n": b""}
+
+# Text a page parser reacts to, looked for with whitespace removed since show
+# operators split lines and words at will
+#   Stage          every rank / percentile block (Stage line or Stage table header)
+#   SeatsAllotted  seat type headings ("Home University Seats Allotted to ...")
+#   StateLevel     the "State Level" seat type
+MARKERS = ("Stage", "SeatsAllotted", "StateLevel")
+# College / course headings ("2254 - ...", "225444110 - ..."), checked where every string starts
+heading_pattern = re.compile(r"\s*\d+\s*[-–]")
+# Percentile cells ("(88.5063490)"): rank / percentile lines carried over from a table on an earlier page
+percentile_cell_pattern = re.compile(r"\(\d+\.\d+\)")
+whitespace_pattern = re.compile(r"\s+")
+hex_whitespace_pattern = re.compile(rb"\s+")
+
+
+def _unescape(literal):
+    def replace(match):
+        escaped = match.group(1)
+        if escaped[:1].isdigit():
+            return bytes([int(escaped, 8) & 0xFF])
+        return LITERAL_ESCAPES.get(escaped, escaped)
+    return literal_escape_pattern.sub(replace, literal)
+
+
+def _page_fonts(page):
+    """Font name -> pdfminer font, from the document's resource manager (shared with extract_text())."""
+    resources = page.page_obj.resources or {}
+    fonts = {}
+    for name, spec in dict_value(resources.get("Font") or {}).items():
+        objid = spec.objid if isinstance(spec, PDFObjRef) else None
+        fonts[name] = page.pdf.rsrcmgr.get_font(objid, dict_value(spec))
+    return fonts
+
+
+def _has_forms(page):
+    # Form XObjects have content streams of their own, which this scan doesn't read
+    resources = page.page_obj.resources or {}
+    for xobject in dict_value(resources.get("XObject") or {}).values():
+        xobject = resolve1(xobject)
+        if isinstance(xobject, PDFStream) and xobject.get("Subtype") is LIT("Form"):
+            return True
+    return False
+
+
+def _shown_strings(page):
+    """The page's strings as text, in content stream order, or None when they can't all be decoded."""
+    data = b"".join(resolve1(stream).get_data() for stream in page.page_obj.contents)
+    if inline_image_pattern.search(data):
+        return None
+
+    fonts = _page_fonts(page)
+    font = None
+    strings = []
+    for match in content_pattern.finditer(data):
+        if match.group("font") is not None:
+            font = fonts.get(match.group("font").decode("latin-1"))
+            continue
+
+        if match.group("literal") is not None:
+            raw = _unescape(match.group("literal"))
+        else:
+            digits = hex_whitespace_pattern.sub(b"", match.group("hex"))
+            raw = bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode("ascii"))
+        if font is None:
+            return None
+        try:
+            strings.append("".join(font.to_unichr(cid) for cid in font.decode(raw)))
+        except PDFUnicodeNotDefined:
+            return None
+    return strings
+
+
+def may_have_rows(page):
+    """Cheap check, from the page's raw content stream, of whether a page parser could get anything from it.
+
+    Strings are decoded with the page's fonts but not laid out. False only
+    when all of them decode and there is no Stage block, percentile cell, seat
+    type or code-prefixed heading among them: cover pages, legends, notes.
+    Such a page gives no rows to the engineering and M.E. parsers and leaves
+    their college / course / seat type as they were, so extract_text() can be
+    skipped; the MBA parser can still read capitalised notes as categories,
+    so its strategies parse every page. Anything the scan can't read with
+    confidence counts as True.
+    """
+    if _has_forms(page):
+        return True
+
+    strings = _shown_strings(page)
+    if strings is None:
+        return True
+
+    text = "".join(strings)
+    offset = 0
+    for string in strings:
+        if heading_pattern.match(text, offset):
+            return True
+        offset += len(string)
+
+    text = whitespace_pattern.sub("", text)
+    return any(marker in text for marker in MARKERS) or percentile_cell_pattern.search(text) is not None
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from line_classifier import LINE_TYPES
+
+# Wall time buckets. "extract" and "parse" are summed over pages, so with
+# workers they add up CPU time across the pool rather than elapsed time.
+PHASES = ("open", "extract", "parse", "write")
+
+# Reasons a page parser or resolve_rows() can drop a row
+NO_RANK_LINE = "no_rank_line"                    # Stage line not followed by an "I ..." rank line
+NO_PERCENTILE_LINE = "no_percentile_line"        # rank line is the last line of the page
+COUNT_MISMATCH = "count_mismatch"                # fewer ranks / percentiles than categories
+NO_PERCENTILE = "no_percentile"                  # geometry: rank cell without a percentile under it
+UNRESOLVED_HEADING = "unresolved_college_course"  # no college / course set on this or earlier pages
+
+# Counted instead of its line type for a COLLEGE / COURSE line that names no
+# college or course ("12 - note"); the page parser keeps the headings in effect
+UNRECOGNISED_HEADING = "UNRECOGNISED_HEADING"
+
+# Least seconds between two progress records (the last page is always reported)
+PROGRESS_INTERVAL = 0.5
+
+
+def new_page_stats():
+    """Per-page counters a page parser returns next to (rows, state)."""
+    return {"lines": {}, "dropped": {}}
+
+
+def count(counters, key, amount=1):
+    if amount:
+        counters[key] = counters.get(key, 0) + amount
+
+
+class ParseMetrics:
+    """Timings and counters for one parse, for --metrics-json and upload-parse's metadata.
+
+    Pass one to parse_pdf(); iter_page_results(), resolve_rows() and
+    write_rows_csv() fill it in as the parse streams through them.
+
+    progress, if given, is called with a progress record (progress_record())
+    as pages come in, at most every PROGRESS_INTERVAL seconds; the page
+    iterators then leave out their tqdm bars.
+    """
+
+    def __init__(self, progress=None):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.pages = []
+        self.lines = dict.fromkeys(LINE_TYPES + (UNRECOGNISED_HEADING,), 0)
+        self.dropped = {}
+        self.rows_emitted = 0
+        self.progress = progress
+        self.total_pages = None
+        self.rows_parsed = 0
+        self._reported = None
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - started
+
+    def add_page(self, number, info, page_stats, rows):
+        self.phases["extract"] += info["extract_s"]
+        self.phases["parse"] += info["parse_s"]
+        self.pages.append({
+            "page": number + 1,
+            "extractSeconds": round(info["extract_s"], 4),
+            "parseSeconds": round(info["parse_s"], 4),
+            "cacheHit": info["cache_hit"],
+            "pruned": info["pruned"],
+            "rows": rows
+        })
+        for line_type, amount in page_stats["lines"].items():
+            count(self.lines, line_type, amount)
+        for reason, amount in page_stats["dropped"].items():
+            count(self.dropped, reason, amount)
+
+        self.rows_parsed += rows
+        if self.progress is not None:
+            now = time.perf_counter()
+            last_page = len(self.pages) == self.total_pages
+            if last_page or self._reported is None or now - self._reported >= PROGRESS_INTERVAL:
+                self._reported = now
+                self.progress(self.progress_record())
+
+    def progress_record(self):
+        """Pages done, rows parsed so far and a linear ETA for the rest of the pages."""
+        elapsed = time.perf_counter() - self.started
+        done = len(self.pages)
+        eta = None
+        if done and self.total_pages is not None:
+            eta = round(elapsed / done * (self.total_pages - done), 1)
+        return {
+            "pagesDone": done,
+            "totalPages": self.total_pages,
+            "rowsSoFar": self.rows_parsed,
+            "elapsedSeconds": round(elapsed, 1),
+            "etaSeconds": eta
+        }
+
+    def drop(self, reason, amount=1):
+        count(self.dropped, reason, amount)
+
+    def to_dict(self):
+        return {
+            "totalSeconds": round(time.perf_counter() - self.started, 3),
+            "phaseSeconds": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "pageCount": len(self.pages),
+            "cacheHits": sum(1 for page in self.pages if page["cacheHit"]),
+            "prunedPages": sum(1 for page in self.pages if page["pruned"]),
+            "linesByType": self.lines,
+            "rowsEmitted": self.rows_emitted,
+            "rowsDropped": dict(self.dropped),
+            "pages": self.pages
+        }
+
+    def write(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        print(f"Metrics: {path}")
+
+
+def print_progress(record):
+    """ParseMetrics progress callback for --progress-json: one JSON line per record on stderr."""
+    print(json.dumps(record), file=sys.stderr, flush=True)
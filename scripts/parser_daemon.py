@@ -0,0 +1,184 @@
+"""Long-running parser service for the Next.js API routes.
+
+Keeps pdfplumber imported and a process pool warm, and answers
+JSON-lines requests on stdin:
+
+    {"id": 1, "command": "parse", "args": {"pdf_path": "...", "output_csv": "...", "analysis": {...}}}
+
+with one JSON line per request on stdout:
+
+    {"id": 1, "ok": true, "result": {...}, "log": "..."}
+    {"id": 1, "ok": false, "error": "...", "log": "..."}
+
+A "parse" with "progress": true also sends progress records for its request
+while it runs, before the response:
+
+    {"id": 1, "event": "progress", "progress": {"pagesDone": 12, "totalPages": 40, "rowsSoFar": 310, ...}}
+
+Anything the parsers print is captured into "log"; stdout carries nothing but
+protocol lines. The daemon exits when stdin is closed.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cutoff_engine
+from cutoff_pipeline import resolve_workers
+from extract_detailed_sample import extract_detailed_sample
+from extract_sample import extract_sample
+from parse_metrics import ParseMetrics
+
+# How many requests may run at once (sampling shouldn't queue behind a long parse)
+MAX_CONCURRENT_REQUESTS = 4
+
+
+class _RequestOutput(io.TextIOBase):
+    """sys.stdout replacement that sends print() output to the current request's log."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            return self.fallback.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        self.fallback.flush()
+
+
+def _init_pool_worker():
+    # Pool workers must never write to the protocol stream
+    sys.stdout = sys.stderr
+
+
+def _pool_context():
+    # The pool starts its workers on the first submit, from a request thread while
+    # the stdin reader and other requests run; a fork then could copy a lock some
+    # other thread holds, so workers come from a fresh server process instead
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class ParserDaemon:
+    def __init__(self, workers):
+        self.workers = workers
+        self.pool = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                                            initializer=_init_pool_worker)
+        self.requests = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+        self.write_lock = threading.Lock()
+        self.local = threading.local()
+
+        self.protocol_out = sys.stdout
+        self.output = _RequestOutput(sys.stderr)
+        sys.stdout = self.output
+
+        self.commands = {
+            "ping": self.ping,
+            "parse": self.parse,
+            "sample": self.sample,
+            "detailed_sample": self.detailed_sample
+        }
+
+    def ping(self):
+        return {"pid": os.getpid(), "workers": self.workers}
+
+    def parse(self, pdf_path, output_csv, analysis=None, columns=False, page_cache=None, metrics=False,
+              rollups=None, search_index=False, progress=False):
+        # With metrics=True the summary carries the ParseMetrics dict as "metrics".
+        # Either way the summary's record_count is the number of rows in the CSV and
+        # strategy the parsing strategy the pages went through.
+        parse_metrics = None
+        if metrics or progress:
+            parse_metrics = ParseMetrics(progress=self.progress_sender(self.local.request_id) if progress else None)
+
+        # Without an analysis this is a plain engineering parse, as parse_cutoff.py does
+        summary = cutoff_engine.parse_pdf(
+            pdf_path, output_csv, analysis, strategy=None if analysis else "engineering_format",
+            keep_empty=bool(analysis), workers=self.workers, executor=self.pool, columns=columns,
+            page_cache=page_cache, metrics=parse_metrics, rollups=rollups, search_index=search_index
+        )
+        if not analysis and not summary["record_count"]:
+            raise ValueError("No data extracted from PDF")
+
+        if metrics:
+            summary["metrics"] = parse_metrics.to_dict()
+        return summary
+
+    def progress_sender(self, request_id):
+        """ParseMetrics progress callback that sends records as progress events of request_id."""
+        def send_progress(record):
+            self.send({"id": request_id, "event": "progress", "progress": record})
+        return send_progress
+
+    def sample(self, pdf_path, sample_pages=5, page_cache=None):
+        return {"text": extract_sample(pdf_path, sample_pages, page_cache)}
+
+    def detailed_sample(self, pdf_path, sample_pages=10, page_cache=None):
+        return extract_detailed_sample(pdf_path, sample_pages, page_cache)
+
+    def send(self, message):
+        with self.write_lock:
+            self.protocol_out.write(json.dumps(message) + "\n")
+            self.protocol_out.flush()
+
+    def handle(self, request):
+        request_id = request.get("id")
+        command = self.commands.get(request.get("command"))
+        if command is None:
+            self.send({"id": request_id, "ok": False, "error": f"Unknown command: {request.get('command')}"})
+            return
+
+        log = io.StringIO()
+        self.output.local.buffer = log
+        self.local.request_id = request_id
+        try:
+            result = command(**(request.get("args") or {}))
+            self.send({"id": request_id, "ok": True, "result": result, "log": log.getvalue()})
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            self.send({"id": request_id, "ok": False, "error": str(e), "log": log.getvalue()})
+        finally:
+            self.output.local.buffer = None
+
+    def serve(self):
+        self.send({"event": "ready", **self.ping()})
+
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self.send({"id": None, "ok": False, "error": "Invalid JSON request"})
+                continue
+            self.requests.submit(self.handle, request)
+
+        self.requests.shutdown(wait=True)
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve parse / sample requests over stdin/stdout JSON lines")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Size of the page-parsing process pool (0 = one per core)")
+    args = parser.parse_args()
+
+    ParserDaemon(resolve_workers(args.workers)).serve()
+
+
+if __name__ == "__main__":
+    main()
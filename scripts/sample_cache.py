@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+
+# Default sample_pages of extract_sample (analyze-pdf) and extract_detailed_sample (debug-pdf)
+SAMPLER_PAGE_COUNTS = (5, 10)
+
+# Subdirectory of the page cache directory that holds sampled page text
+SAMPLES_DIR = "samples"
+
+
+def sampled_page_numbers(total_pages, sample_pages):
+    """0-based page numbers a sampler reads: the first sample_pages, then the middle and last page."""
+    pages_to_read = min(sample_pages, total_pages)
+    numbers = list(range(pages_to_read))
+    if total_pages > pages_to_read * 2:
+        numbers.append(total_pages // 2)
+    if total_pages > pages_to_read:
+        numbers.append(total_pages - 1)
+    return numbers
+
+
+def parse_sampled_page_numbers(total_pages):
+    """Page numbers either sampler may ask for, which a parse keeps in the cache."""
+    numbers = set()
+    for sample_pages in SAMPLER_PAGE_COUNTS:
+        numbers.update(sampled_page_numbers(total_pages, sample_pages))
+    return sorted(numbers)
+
+
+def file_hash(pdf_path):
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SampleCache:
+    """extract_text() of a PDF's sampled pages, on disk, keyed by the file's hash.
+
+    analyze-pdf, debug-pdf and the parse all read the first pages, the middle
+    and the last page of the same upload. Whichever step gets to a page first
+    stores its text here, and the others reuse it instead of extracting it again.
+    With cache_dir None the text is only kept in memory, for steps of one run
+    (strategy detection and the parse).
+    """
+
+    def __init__(self, cache_dir, pdf_path):
+        self.path = None
+        self.pages = {}
+        self.changed = False
+        if cache_dir is None:
+            return
+        self.path = os.path.join(cache_dir, SAMPLES_DIR, f"{file_hash(pdf_path)}.json")
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.pages = {int(number): entry for number, entry in json.load(f).items()}
+        except (OSError, ValueError):
+            pass
+
+    def text(self, page):
+        """extract_text() of a pdfplumber page, from the cache when it is there."""
+        entry = self.pages.setdefault(page.page_number - 1, {})
+        if "text" not in entry:
+            entry["text"] = page.extract_text()
+            self.changed = True
+        return entry["text"]
+
+    def table_count(self, page):
+        """len(page.extract_tables()), from the cache when it is there."""
+        entry = self.pages.setdefault(page.page_number - 1, {})
+        if "tables" not in entry:
+            entry["tables"] = len(page.extract_tables())
+            self.changed = True
+        return entry["tables"]
+
+    def known_texts(self, numbers):
+        """{page number: cached text or None} for the given 0-based page numbers."""
+        return {number: self.pages.get(number, {}).get("text") for number in numbers}
+
+    def add_text(self, number, text):
+        self.pages.setdefault(number, {})["text"] = text
+        self.changed = True
+
+    def save(self):
+        if not self.changed or self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.pages, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.changed = False
@@ -0,0 +1,301 @@
+"""Synthetic CAP cutoff PDFs for benchmarking the parsers offline.
+
+    python scripts/synthetic_cutoff_pdf.py <output.pdf> [--format engineering|mba]
+        [--pages N] [--colleges N] [--courses N] [--categories N] [--filler-pages N] [--seed N]
+
+Pages are laid out like the CET Cell PDFs in public/ (headings, seat type
+lines, Stage tables with one positioned cell per category), written with
+only the standard library so the benchmark needs nothing beyond pdfplumber.
+Filler pages (a cover and notes, no cutoffs) make a sparse PDF.
+"""
+import argparse
+import random
+import zlib
+
+# (seat type line, category suffix); every course gets these tables in turn
+SEAT_TYPES = [
+    ("Home University Seats Allotted to Home University Candidates", "H"),
+    ("Home University Seats Allotted to Other Than Home University Candidates", "H"),
+    ("Other Than Home University Seats Allotted to Other Than Home University Candidates", "O"),
+    ("State Level", "S"),
+]
+
+CATEGORY_PREFIXES = [
+    "GOPEN", "GSC", "GST", "GVJ", "GNT1", "GNT2", "GNT3", "GOBC", "GSEBC",
+    "LOPEN", "LSC", "LST", "LVJ", "LNT1", "LNT2", "LNT3", "LOBC", "LSEBC",
+    "PWDOPEN", "PWDOBC", "DEFOPEN", "DEFOBC",
+]
+
+# MBA PDFs spell the nomadic tribe categories with letters (GNTBH, not GNT1H)
+MBA_CATEGORY_PREFIXES = [prefix.replace("NT1", "NTB").replace("NT2", "NTC").replace("NT3", "NTD")
+                         for prefix in CATEGORY_PREFIXES]
+
+ENGINEERING_COURSES = [
+    "Civil Engineering", "Computer Science and Engineering", "Information Technology",
+    "Electrical Engineering", "Mechanical Engineering", "Electronics and Telecommunication Engineering",
+    "Chemical Engineering", "Artificial Intelligence and Data Science Engineering",
+]
+
+MBA_COURSES = ["M. B. A.", "M. M. S.", "M. B. A. (Integrated)"]
+
+ENGINEERING_TITLE = [
+    "Government of Maharashtra",
+    "State Common Entrance Test Cell",
+    "Cut Off List for Maharashtra & Minority Seats of CAP Round - I for the Admission to the First Year "
+    "Under Graduate Technical Courses in Engineering and Technology (4 Years)",
+]
+
+MBA_TITLE = [
+    "GOVERNMENT OF MAHARASHTRA",
+    "State Common Entrance Test Cell, Mumbai.",
+    "Cut Off Merit for Maharashtra & Minority Seats CAP Round-I for Admission to First Year of Two Years "
+    "Full Time Post Graduate Degree Course in Management viz . MBA/MMS",
+]
+
+LEGEND = ("Legends:Start Character G-General, L-Ladies, End Character H-Home University, "
+          "O-Other than Home University, S-State Level")
+
+# Body of the filler pages: instructions and notes with no headings, seat types or cutoffs
+FILLER_LINES = [
+    "Instructions and notes for candidates",
+    "The cut off shown under each category is the merit of the last candidate admitted in it.",
+    "Candidates are advised to verify the details on the official website before reporting.",
+    "Seats that remain vacant after this round are carried over to the next round.",
+    "Allotments made in this round are provisional until documents are verified at the institute.",
+    # Capitalised notice like the real notes pages; the MBA parser reads such lines as categories
+    "IMPORTANT NOTE: SEATS ARE ALLOTTED AS PER MERIT",
+]
+
+# Landscape page like the engineering PDFs; y values below are distances from the top
+PAGE_WIDTH = 1440
+PAGE_HEIGHT = 842
+TOP_MARGIN = 90
+BOTTOM_MARGIN = 80
+
+# Stage table geometry, taken from the engineering PDFs
+LABEL_X = 46.9
+FIRST_CELL_X = 73.0
+COLUMN_WIDTH = 51.2
+TOTAL_CANDIDATES = 200000
+
+
+class _Page:
+    def __init__(self):
+        self.ops = []
+        self.y = TOP_MARGIN
+
+    def text(self, x, top, text, size=8, bold=False):
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        font = "F2" if bold else "F1"
+        self.ops.append(f"BT /{font} {size} Tf {x:.1f} {PAGE_HEIGHT - top - size:.1f} Td ({escaped}) Tj ET")
+
+    def fits(self, height):
+        return self.y + height <= PAGE_HEIGHT - BOTTOM_MARGIN
+
+
+class _Layout:
+    """Lays out blocks of lines top to bottom, starting a new page when one doesn't fit."""
+
+    def __init__(self, title, max_pages):
+        self.title = title
+        self.max_pages = max_pages
+        self.pages = []
+        self._new_page()
+
+    def _new_page(self):
+        page = _Page()
+        for idx, line in enumerate(self.title):
+            page.text(30 if idx < 2 else 160, 20 + idx * 16, line, size=10 if idx < 2 else 8, bold=idx < 2)
+        self.pages.append(page)
+
+    @property
+    def full(self):
+        return self.max_pages is not None and len(self.pages) > self.max_pages
+
+    def block(self, height, draw):
+        """Draw one block that must stay on a single page; draw(page, top) does the drawing."""
+        page = self.pages[-1]
+        if not page.fits(height):
+            self._new_page()
+            page = self.pages[-1]
+        if not self.full:
+            draw(page, page.y)
+        page.y += height
+
+    def finish(self, filler_pages=0):
+        """The laid out pages plus filler_pages filler pages: a cover first, the rest spread between them."""
+        pages = self.pages[:self.max_pages] if self.max_pages else self.pages
+        for page in pages:
+            page.text(30, PAGE_HEIGHT - BOTTOM_MARGIN + 10, LEGEND, size=7)
+
+        if filler_pages:
+            fillers = [_filler_page() for _ in range(filler_pages)]
+            step = len(pages) / max(filler_pages - 1, 1)
+            for idx in range(filler_pages - 1, 0, -1):
+                pages.insert(round(idx * step), fillers[idx])
+            pages.insert(0, fillers[0])
+
+        for number, page in enumerate(pages, start=1):
+            page.text(PAGE_WIDTH / 2, PAGE_HEIGHT - 30, str(number), size=7)
+        return pages
+
+
+def _filler_page():
+    page = _Page()
+    while page.fits(24):
+        for line in FILLER_LINES:
+            page.text(30, page.y, line, size=9)
+            page.y += 24
+    return page
+
+
+def _stage_values(rng, count):
+    """count (rank, percentile) cells; percentile falls as rank grows, like real cutoffs."""
+    values = []
+    for _ in range(count):
+        rank = rng.randint(1, TOTAL_CANDIDATES)
+        values.append((rank, round(100 * (1 - rank / TOTAL_CANDIDATES), 7)))
+    return values
+
+
+def _engineering_table(seat_type, categories, values):
+    def draw(page, top):
+        page.text(28.8, top, seat_type)
+        top += 28
+        page.text(39.6, top, "Stage", size=7)
+        for column, category in enumerate(categories):
+            page.text(FIRST_CELL_X + 7 + column * COLUMN_WIDTH, top - 2, category, size=7)
+        page.text(LABEL_X, top + 24, "I", size=7)
+        for column, (rank, percentile) in enumerate(values):
+            x = FIRST_CELL_X + column * COLUMN_WIDTH
+            page.text(x, top + 24, str(rank), size=7)
+            page.text(x, top + 32, f"({percentile:.7f})", size=7)
+    return draw
+
+
+def _mba_table(seat_type, categories, values):
+    def draw(page, top):
+        page.text(28.8, top, seat_type)
+        top += 28
+        for column, category in enumerate(categories):
+            page.text(FIRST_CELL_X + 7 + column * COLUMN_WIDTH, top, category, size=7)
+        for column, (rank, percentile) in enumerate(values):
+            x = FIRST_CELL_X + column * COLUMN_WIDTH
+            page.text(x, top + 12, str(rank), size=7)
+            page.text(x, top + 36, f"({percentile:.7f})", size=7)
+        page.text(39.6, top + 24, "Stage-I", size=7)
+    return draw
+
+
+def _heading(text, x=18, size=8):
+    def draw(page, top):
+        page.text(x, top, text, size=size)
+    return draw
+
+
+def generate_cutoff_pdf(output_pdf, format="engineering", pages=20, colleges=None, courses=4, categories=8,
+                        seed=0, filler_pages=0):
+    """Write a synthetic cutoff PDF and return {"pages", "colleges", "rows"} for what went in.
+
+    Colleges of `courses` courses each are laid out until `pages` pages are
+    full (or `colleges` colleges are written, whichever comes first). Every
+    seat type table has `categories` categories with a rank and percentile
+    each, so "rows" is what a lossless parse should emit. filler_pages pages
+    without cutoffs are added on top of `pages`.
+    """
+    if pages is None and colleges is None:
+        raise ValueError("Give pages, colleges or both")
+
+    rng = random.Random(seed)
+    mba = format == "mba"
+    layout = _Layout(MBA_TITLE if mba else ENGINEERING_TITLE, pages)
+    course_names = MBA_COURSES if mba else ENGINEERING_COURSES
+    category_prefixes = MBA_CATEGORY_PREFIXES if mba else CATEGORY_PREFIXES
+    table = _mba_table if mba else _engineering_table
+    # Seat type line plus the Stage table under it
+    table_height = 80 if mba else 76
+
+    college_count = 0
+    rows = 0
+    while not layout.full and (colleges is None or college_count < colleges):
+        college_count += 1
+        college_code = f"{1000 + college_count}" if mba else f"{1000 + college_count:05d}"
+        layout.block(18, _heading(f"{college_code} - Synthetic College of Engineering and Research {college_count}"))
+
+        for course_idx in range(courses):
+            if mba:
+                course_code = f"{college_code}{course_idx + 10:05d}"
+            else:
+                course_code = f"{college_code}{course_idx + 100:03d}{10:02d}"
+            course_name = course_names[course_idx % len(course_names)]
+            layout.block(15, _heading(f"{course_code} - {course_name}"))
+            layout.block(18, _heading("Status: Un-Aided Autonomous", x=19.8))
+
+            for seat_type, suffix in SEAT_TYPES:
+                names = [f"{prefix}{suffix}" for prefix in category_prefixes]
+                table_categories = rng.sample(names, min(categories, len(names)))
+                values = _stage_values(rng, len(table_categories))
+                layout.block(table_height, table(seat_type, table_categories, values))
+                if not layout.full:
+                    rows += len(table_categories)
+
+    pdf_pages = layout.finish(filler_pages)
+    _write_pdf(output_pdf, pdf_pages)
+    return {"pages": len(pdf_pages), "colleges": college_count, "rows": rows}
+
+
+def _write_pdf(output_pdf, pages):
+    # 1 catalog, 2 page tree, 3/4 fonts, then a (page, content) pair per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    page_refs = []
+    for page in pages:
+        content = zlib.compress("\n".join(page.ops).encode("latin-1"))
+        page_number = len(objects) + 1
+        page_refs.append(f"{page_number} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {page_number + 1} 0 R >>".encode("ascii")
+        )
+        objects.append(
+            f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode("ascii") + content + b"\nendstream"
+        )
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(pages)} >>".encode("ascii")
+
+    with open(output_pdf, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii"))
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode("ascii"))
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic CAP cutoff PDF")
+    parser.add_argument("output_pdf")
+    parser.add_argument("--format", choices=["engineering", "mba"], default="engineering")
+    parser.add_argument("--pages", type=int, default=20, help="Pages to fill (default 20)")
+    parser.add_argument("--colleges", type=int, help="Stop after this many colleges")
+    parser.add_argument("--courses", type=int, default=4, help="Courses per college (default 4)")
+    parser.add_argument("--categories", type=int, default=8, help="Categories per Stage table (default 8)")
+    parser.add_argument("--filler-pages", type=int, default=0,
+                        help="Add N pages without cutoffs: a cover and notes between the others (default 0)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    info = generate_cutoff_pdf(args.output_pdf, args.format, args.pages, args.colleges, args.courses,
+                               args.categories, args.seed, args.filler_pages)
+    print(f"Wrote {args.output_pdf}: {info['pages']} pages, {info['colleges']} colleges, {info['rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
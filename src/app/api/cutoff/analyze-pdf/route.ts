@@ -1,70 +1,19 @@
 import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
-import { exec } from 'child_process'
-import { promisify } from 'util'
 import Groq from 'groq-sdk'
+import { PAGE_CACHE_DIR, runParserCommand } from '@/lib/parser-daemon'
 
-const execAsync = promisify(exec)
-
-// Extract sample text from PDF using Python
+// Extract sample text from PDF using the warm parser daemon
 async function extractSampleText(pdfPath: string): Promise<string> {
-  const pythonScript = `import pdfplumber
-import sys
-
-pdf_path = sys.argv[1]
-sample_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
-
-try:
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        pages_to_read = min(sample_pages, total_pages)
-        
-        text_samples = []
-        for i in range(pages_to_read):
-            page = pdf.pages[i]
-            text = page.extract_text()
-            if text:
-                text_samples.append(text[:2000])
-        
-        if total_pages > pages_to_read * 2:
-            mid_page = pdf.pages[total_pages // 2]
-            mid_text = mid_page.extract_text()
-            if mid_text:
-                text_samples.append(mid_text[:2000])
-        
-        if total_pages > pages_to_read:
-            last_page = pdf.pages[-1]
-            last_text = last_page.extract_text()
-            if last_text:
-                text_samples.append(last_text[:2000])
-        
-        result = "\\n\\n--- PAGE BREAK ---\\n\\n".join(text_samples)
-        print(result)
-except Exception as e:
-    print(f"ERROR: {str(e)}", file=sys.stderr)
-    sys.exit(1)
-`
-
   try {
-    const scriptsDir = path.join(process.cwd(), 'scripts')
-    if (!fs.existsSync(scriptsDir)) {
-      fs.mkdirSync(scriptsDir, { recursive: true })
-    }
-    
-    const scriptPath = path.join(scriptsDir, 'extract_sample.py')
-    fs.writeFileSync(scriptPath, pythonScript)
-    
-    const pythonCmd = process.platform === 'win32' ? 'python' : 'python3'
-    const { stdout, stderr } = await execAsync(
-      `${pythonCmd} "${scriptPath}" "${pdfPath}" 5`
-    )
-    
-    if (stderr && !stderr.includes('tqdm') && !stderr.includes('Reading PDF')) {
-      console.error('Extraction stderr:', stderr)
-    }
-    
-    return stdout || ''
+    const { result } = await runParserCommand<{ text: string }>('sample', {
+      pdf_path: pdfPath,
+      sample_pages: 5,
+      // Sampled page text is kept for debug-pdf and the parse of the same file
+      page_cache: PAGE_CACHE_DIR
+    })
+    return result.text || ''
   } catch (error: any) {
     console.error('Failed to extract sample text:', error)
     return ''
@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
 import { parse } from 'csv-parse/sync'
+import { loadColumnarRecords } from '@/lib/cutoff-columns'
 import { getCategoryDisplayName, getCategoryFullInfo } from '@/lib/category-normalizer'
 import { extractLocation } from '@/lib/location-extractor'
 
@@ -28,8 +29,8 @@ function getCachedRecords(examId: string) {
     return []
   }
   
-  const csvContent = fs.readFileSync(csvPath, 'utf-8')
-  const records = parse(csvContent, {
+  // Prefer the columnar copy written by the parser; fall back to parsing the CSV
+  const records = loadColumnarRecords(csvPath) || parse(fs.readFileSync(csvPath, 'utf-8'), {
     columns: true,
     skip_empty_lines: true,
     cast: (value, context) => {
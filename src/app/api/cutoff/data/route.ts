@@ -2,6 +2,7 @@ import { NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
 import { parse } from 'csv-parse/sync'
+import { loadColumnarRecords } from '@/lib/cutoff-columns'
 import { extractLocation, extractLocationFromQuery, isLocationQuery } from '@/lib/location-extractor'
 
 // Cache for parsed CSV data
@@ -32,9 +33,8 @@ function getCachedRecords(examId: string) {
     return []
   }
   
-  // Read and parse CSV
-  const csvContent = fs.readFileSync(csvPath, 'utf-8')
-  const records = parse(csvContent, {
+  // Prefer the columnar copy written by the parser; fall back to parsing the CSV
+  const records = loadColumnarRecords(csvPath) || parse(fs.readFileSync(csvPath, 'utf-8'), {
     columns: true,
     skip_empty_lines: true,
     cast: (value, context) => {
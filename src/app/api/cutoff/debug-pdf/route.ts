@@ -1,84 +1,16 @@
 import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
-import { exec } from 'child_process'
-import { promisify } from 'util'
 import Groq from 'groq-sdk'
-
-const execAsync = promisify(exec)
+import { PAGE_CACHE_DIR, runParserCommand } from '@/lib/parser-daemon'
 
 // Extract more detailed sample text from PDF
 async function extractDetailedSample(pdfPath: string): Promise<{ text: string; pageCount: number }> {
-  const pythonScript = `import pdfplumber
-import sys
-import json
-
-pdf_path = sys.argv[1]
-sample_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 10
-
-try:
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        pages_to_read = min(sample_pages, total_pages)
-        
-        text_samples = []
-        structure_info = []
-        
-        for i in range(pages_to_read):
-            page = pdf.pages[i]
-            text = page.extract_text()
-            if text:
-                # Get more text from each page (first 3000 chars)
-                text_samples.append(f"=== PAGE {i+1} ===\\n{text[:3000]}")
-                
-                # Try to extract tables if any
-                tables = page.extract_tables()
-                if tables:
-                    structure_info.append(f"Page {i+1}: Found {len(tables)} table(s)")
-        
-        # Get middle and last pages
-        if total_pages > pages_to_read * 2:
-            mid_page = pdf.pages[total_pages // 2]
-            mid_text = mid_page.extract_text()
-            if mid_text:
-                text_samples.append(f"=== PAGE {total_pages // 2 + 1} (MIDDLE) ===\\n{mid_text[:3000]}")
-        
-        if total_pages > pages_to_read:
-            last_page = pdf.pages[-1]
-            last_text = last_page.extract_text()
-            if last_text:
-                text_samples.append(f"=== PAGE {total_pages} (LAST) ===\\n{last_text[:3000]}")
-        
-        result = {
-            "text": "\\n\\n--- PAGE BREAK ---\\n\\n".join(text_samples),
-            "total_pages": total_pages,
-            "structure_info": structure_info
-        }
-        print(json.dumps(result))
-except Exception as e:
-    print(json.dumps({"error": str(e), "text": "", "total_pages": 0, "structure_info": []}))
-    sys.exit(1)
-`
-
   try {
-    const scriptsDir = path.join(process.cwd(), 'scripts')
-    if (!fs.existsSync(scriptsDir)) {
-      fs.mkdirSync(scriptsDir, { recursive: true })
-    }
-    
-    const scriptPath = path.join(scriptsDir, 'extract_detailed_sample.py')
-    fs.writeFileSync(scriptPath, pythonScript)
-    
-    const pythonCmd = process.platform === 'win32' ? 'python' : 'python3'
-    const { stdout, stderr } = await execAsync(
-      `${pythonCmd} "${scriptPath}" "${pdfPath}" 10`
+    const { result } = await runParserCommand<{ text: string; total_pages: number; structure_info: string[] }>(
+      'detailed_sample',
+      { pdf_path: pdfPath, sample_pages: 10, page_cache: PAGE_CACHE_DIR }
     )
-    
-    if (stderr && !stderr.includes('tqdm') && !stderr.includes('Reading PDF')) {
-      console.error('Extraction stderr:', stderr)
-    }
-    
-    const result = JSON.parse(stdout || '{"text": "", "total_pages": 0, "structure_info": []}')
     return {
       text: result.text || '',
       pageCount: result.total_pages || 0
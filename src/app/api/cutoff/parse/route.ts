@@ -1,11 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
-import { exec } from 'child_process'
-import { promisify } from 'util'
 import { clearCache } from '../data/route'
-
-const execAsync = promisify(exec)
+import { PAGE_CACHE_DIR, runParserCommand } from '@/lib/parser-daemon'
 
 // Exam PDF configurations
 const examPdfConfig: Record<string, { pdfName: string; csvName: string }> = {
@@ -59,32 +56,14 @@ export async function POST(request: NextRequest) {
       )
     }
 
-    // Check if Python is available
-    try {
-      await execAsync('python --version')
-    } catch {
-      try {
-        await execAsync('python3 --version')
-      } catch {
-        return NextResponse.json(
-          { error: 'Python is not installed. Please run the Python script manually.' },
-          { status: 500 }
-        )
-      }
-    }
-
-    // Run the Python script with exam-specific parameters
-    const scriptPath = path.join(process.cwd(), 'scripts', 'parse_cutoff.py')
-    const pythonCmd = process.platform === 'win32' ? 'python' : 'python3'
-    
+    // Run the parser on the warm daemon with exam-specific parameters
     try {
-      const { stdout, stderr } = await execAsync(
-        `${pythonCmd} "${scriptPath}" "${pdfPath}" "${csvPath}"`
-      )
-      
-      if (stderr && !stderr.includes('tqdm')) {
-        console.error('Python script stderr:', stderr)
-      }
+      const { log } = await runParserCommand('parse', {
+        pdf_path: pdfPath,
+        output_csv: csvPath,
+        columns: true,
+        page_cache: PAGE_CACHE_DIR
+      })
       
       // Check if CSV was created
       if (fs.existsSync(csvPath)) {
@@ -96,11 +75,11 @@ export async function POST(request: NextRequest) {
           message: 'PDF parsed successfully',
           csvPath: `/${config.csvName}`,
           size: stats.size,
-          stdout: stdout
+          stdout: log
         })
       } else {
         return NextResponse.json(
-          { error: 'CSV file was not created', stderr },
+          { error: 'CSV file was not created', stderr: log },
           { status: 500 }
         )
       }
@@ -2,12 +2,18 @@ import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
 import { parse } from 'csv-parse/sync'
+import { loadColumnarRecords } from '@/lib/cutoff-columns'
+import {
+  SearchIndex, allTokensPostings, intersectSorted, loadSearchIndex, percentileCandidates, unionSorted
+} from '@/lib/cutoff-index'
 import Groq from 'groq-sdk'
 import { getCategoryDisplayName, getCategoryFullInfo, getNormalizedCategories } from '@/lib/category-normalizer'
 import { extractLocation, extractLocationFromQuery, isLocationQuery, extractAllLocations } from '@/lib/location-extractor'
 
 // Cache for parsed CSV data
 let cachedRecords: Record<string, any[]> = {}
+// Search index of the cached records (null when the parser didn't write one)
+let cachedIndexes: Record<string, SearchIndex | null> = {}
 let cacheTimestamp: Record<string, number> = {}
 const CACHE_DURATION = 5 * 60 * 1000 // 5 minutes
 
@@ -29,8 +35,8 @@ function getCachedRecords(examId: string) {
     return []
   }
   
-  const csvContent = fs.readFileSync(csvPath, 'utf-8')
-  const records = parse(csvContent, {
+  // Prefer the columnar copy written by the parser; fall back to parsing the CSV
+  const records = loadColumnarRecords(csvPath) || parse(fs.readFileSync(csvPath, 'utf-8'), {
     columns: true,
     skip_empty_lines: true,
     cast: (value, context) => {
@@ -41,6 +47,7 @@ function getCachedRecords(examId: string) {
   })
   
   cachedRecords[examId] = records
+  cachedIndexes[examId] = loadSearchIndex(csvPath)
   cacheTimestamp[examId] = now
   
   return records
@@ -114,6 +121,29 @@ function matchCategoryCode(userCategory: string, allCategories: string[]): strin
   return matched
 }
 
+function matchesLocation(r: any, locationLower: string) {
+  const collegeLocation = extractLocation(r.college_name || '')
+  if (collegeLocation) {
+    return collegeLocation.toLowerCase().includes(locationLower) ||
+           locationLower.includes(collegeLocation.toLowerCase())
+  }
+  // Fallback: check if location appears in college name
+  return r.college_name?.toLowerCase().includes(locationLower)
+}
+
+function matchesCourse(r: any, matchedCourses: string[]) {
+  return matchedCourses.some(mc => r.course_name?.toLowerCase().includes(mc.toLowerCase()))
+}
+
+function sortByPercentile(records: any[]) {
+  // Sort by percentile (descending) to get best options
+  return records.sort((a: any, b: any) => {
+    const aPercentile = parseFloat(a.percentile) || 0
+    const bPercentile = parseFloat(b.percentile) || 0
+    return bPercentile - aPercentile
+  })
+}
+
 // Get relevant cutoff data for recommendation with intelligent matching
 function getRelevantData(
   records: any[], 
@@ -136,15 +166,7 @@ function getRelevantData(
   // Match location if provided
   if (location) {
     const locationLower = location.toLowerCase()
-    filtered = filtered.filter((r: any) => {
-      const collegeLocation = extractLocation(r.college_name || '')
-      if (collegeLocation) {
-        return collegeLocation.toLowerCase().includes(locationLower) ||
-               locationLower.includes(collegeLocation.toLowerCase())
-      }
-      // Fallback: check if location appears in college name
-      return r.college_name?.toLowerCase().includes(locationLower)
-    })
+    filtered = filtered.filter((r: any) => matchesLocation(r, locationLower))
   }
   
   // Match course if provided
@@ -152,9 +174,7 @@ function getRelevantData(
     const searchText = question ? `${courseName || ''} ${question}`.trim() : courseName || ''
     if (searchText) {
       const matchedCourses = matchCourseName(searchText, allCourses)
-      filtered = filtered.filter((r: any) => 
-        matchedCourses.some(mc => r.course_name?.toLowerCase().includes(mc.toLowerCase()))
-      )
+      filtered = filtered.filter((r: any) => matchesCourse(r, matchedCourses))
     }
   }
   
@@ -166,14 +186,68 @@ function getRelevantData(
     }
   }
   
-  // Sort by percentile (descending) to get best options
-  filtered.sort((a: any, b: any) => {
-    const aPercentile = parseFloat(a.percentile) || 0
-    const bPercentile = parseFloat(b.percentile) || 0
-    return bPercentile - aPercentile
-  })
-  
-  return filtered
+  return sortByPercentile(filtered)
+}
+
+// Same result as getRelevantData, from the parser's search index: a binary search per
+// (category, seat type) bucket, then course posting lists narrow the rows the
+// matchers above still have to check. Row ids index into the full records array.
+function getIndexedData(
+  records: any[],
+  index: SearchIndex,
+  percentile: number,
+  courseName?: string,
+  category?: string,
+  question?: string,
+  location?: string
+) {
+  let matchedCategories: string[] | null = null
+  if (category) {
+    const matched = matchCategoryCode(category, index.categories)
+    if (matched.length > 0) matchedCategories = matched
+  }
+
+  let ids = percentileCandidates(records, index, percentile, matchedCategories)
+
+  if (location) {
+    const locationLower = location.toLowerCase()
+    // matchesLocation() matches substrings ("Nagar" in "Ahmednagar"), which word
+    // postings can't narrow down, so it checks every percentile candidate
+    ids = ids.filter(id => matchesLocation(records[id], locationLower))
+  }
+
+  if (courseName || question) {
+    const searchText = question ? `${courseName || ''} ${question}`.trim() : courseName || ''
+    const matchedCourses = searchText ? matchCourseName(searchText, index.courses) : index.courses
+    // Every row's own course is in index.courses, so matching all of them filters nothing
+    if (matchedCourses.length < index.courses.length) {
+      // matchesCourse() matches substrings ("Pharm" in "Pharmacy"), so the course
+      // names it accepts are picked from the dictionary first, like locations
+      // are checked by substring; a matching row has every word of one of them
+      const acceptedCourses = index.courses.filter(name => matchesCourse({ course_name: name }, matchedCourses))
+      const lists = acceptedCourses.map(name => allTokensPostings(index.courseTokens, name))
+      if (lists.every(list => list !== null)) {
+        ids = intersectSorted(ids, unionSorted(lists as number[][]))
+      }
+      ids = ids.filter(id => matchesCourse(records[id], matchedCourses))
+    }
+  }
+
+  return sortByPercentile(ids.map(id => records[id]))
+}
+
+/**
+ * With CUTOFF_INDEX_CHECK set, log queries the search index answers differently
+ * from the row scan (e.g. partial course names like "Pharm")
+ */
+function warnIfIndexDiffers(indexed: any[], scanned: any[], query: Record<string, unknown>) {
+  if (indexed.length !== scanned.length || indexed.some((r, i) => r !== scanned[i])) {
+    console.warn('Search index result differs from the row scan:', {
+      ...query,
+      indexedRows: indexed.length,
+      scannedRows: scanned.length
+    })
+  }
 }
 
 export async function POST(request: NextRequest) {
@@ -297,17 +371,28 @@ Respond with JSON only:
     const userIntent = intentMatch ? JSON.parse(intentMatch[0]) : JSON.parse(intentJson)
     
     // STEP 2: Get relevant data based on understood intent (use valid records only)
+    // With the parser's search index, only rows that can match are looked at
+    const index = cachedIndexes[examId]
+    const findRelevant = (percentile: number, course?: string, cat?: string, q?: string, location?: string) => {
+      if (!index) return getRelevantData(validRecords, percentile, course, cat, q, location)
+      const indexed = getIndexedData(records, index, percentile, course, cat, q, location)
+      if (process.env.CUTOFF_INDEX_CHECK) {
+        const scanned = getRelevantData(validRecords, percentile, course, cat, q, location)
+        warnIfIndexDiffers(indexed, scanned, { examId, percentile, course, cat, q, location })
+      }
+      return indexed
+    }
     const understoodCourse = userIntent.understoodCourse || courseName
     const understoodCategory = userIntent.understoodCategory || category
     const understoodLocation = userIntent.understoodLocation || (question ? extractLocationFromQuery(question) : null)
-    const relevantData = getRelevantData(validRecords, userPercentile, understoodCourse, understoodCategory, question, understoodLocation || undefined)
+    const relevantData = findRelevant(userPercentile, understoodCourse, understoodCategory, question, understoodLocation || undefined)
     
     // Also get broader data for comparison
     const allRelevantData = understoodCategory 
-      ? getRelevantData(validRecords, userPercentile, undefined, understoodCategory, undefined, understoodLocation || undefined)
-      : getRelevantData(validRecords, userPercentile, undefined, undefined, undefined, understoodLocation || undefined)
+      ? findRelevant(userPercentile, undefined, understoodCategory, undefined, understoodLocation || undefined)
+      : findRelevant(userPercentile, undefined, undefined, undefined, understoodLocation || undefined)
     const courseSpecificData = understoodCourse 
-      ? getRelevantData(validRecords, userPercentile, understoodCourse, undefined, undefined, understoodLocation || undefined)
+      ? findRelevant(userPercentile, understoodCourse, undefined, undefined, understoodLocation || undefined)
       : []
     
     // Prepare comprehensive data summary
@@ -1,12 +1,35 @@
 import { NextRequest, NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
-import { exec } from 'child_process'
-import { promisify } from 'util'
 import { clearCache } from '../data/route'
+import { PAGE_CACHE_DIR, ParseMetrics, ParseProgress, runParserCommand } from '@/lib/parser-daemon'
+import { getRollupsPath, parseExamRound } from '@/lib/cutoff-rollups'
+import { enqueueParseJob, getActiveParseJob, getParseJob, getQueuePosition, ParseJob, ParseJobResponse } from '@/lib/parse-jobs'
 
-const execAsync = promisify(exec)
+type UploadParseRequest = {
+  examId: string
+  examName: string
+  year: string
+  providedStrategy?: string
+}
+
+function jobStatus(job: ParseJob) {
+  return {
+    jobId: job.id,
+    examId: job.examId,
+    year: job.year,
+    status: job.status,
+    queuePosition: getQueuePosition(job),
+    progress: job.progress,
+    // The parse result (what this route used to answer) once the job has finished
+    result: job.response?.body ?? null
+  }
+}
 
+/**
+ * Queue a parse of an uploaded PDF and answer with its job id right away;
+ * poll GET ?jobId=... for progress and the result
+ */
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
@@ -19,8 +42,65 @@ export async function POST(request: NextRequest) {
       )
     }
 
+    // Check if PDF exists
     const pdfFileName = `${examId}_${year}.pdf`
-    const pdfPath = path.join(process.cwd(), 'public', pdfFileName)
+    if (!fs.existsSync(path.join(process.cwd(), 'public', pdfFileName))) {
+      return NextResponse.json(
+        { error: `PDF file not found: ${pdfFileName}` },
+        { status: 404 }
+      )
+    }
+
+    // Another year of this exam would overwrite the same CSV mid-parse
+    const activeJob = getActiveParseJob(examId)
+    if (activeJob && activeJob.year !== year) {
+      return NextResponse.json(
+        {
+          error: `A parse of ${examId} ${activeJob.year} is still in progress; try again when it finishes`,
+          jobId: activeJob.id
+        },
+        { status: 409 }
+      )
+    }
+
+    const origin = request.nextUrl.origin
+    const job = enqueueParseJob(examId, year, (onProgress) =>
+      runUploadParse({ examId, examName, year, providedStrategy }, origin, onProgress)
+    )
+
+    return NextResponse.json(jobStatus(job), { status: 202 })
+  } catch (error: any) {
+    console.error('Request error:', error)
+    return NextResponse.json(
+      { error: 'Internal server error', details: error.message },
+      { status: 500 }
+    )
+  }
+}
+
+/**
+ * Status, progress (pages done, rows so far, ETA) and, once finished, the result of a parse job
+ */
+export async function GET(request: NextRequest) {
+  const jobId = request.nextUrl.searchParams.get('jobId')
+  if (!jobId) {
+    return NextResponse.json({ error: 'jobId is required' }, { status: 400 })
+  }
+
+  const job = getParseJob(jobId)
+  if (!job) {
+    return NextResponse.json({ error: `Unknown or expired job: ${jobId}` }, { status: 404 })
+  }
+  return NextResponse.json(jobStatus(job))
+}
+
+async function runUploadParse(
+  { examId, examName, year, providedStrategy }: UploadParseRequest,
+  origin: string,
+  onProgress: (progress: ParseProgress) => void
+): Promise<ParseJobResponse> {
+  try {
+    const pdfPath = path.join(process.cwd(), 'public', `${examId}_${year}.pdf`)
     const csvFileName = `cutoffs_${examId}.csv`
     const csvPath = path.join(process.cwd(), 'public', csvFileName)
 
@@ -52,7 +132,7 @@ export async function POST(request: NextRequest) {
     // If still no analysis, try LLM analysis
     if (!analysis) {
       try {
-        const analyzeResponse = await fetch(`${request.nextUrl.origin}/api/cutoff/analyze-pdf`, {
+        const analyzeResponse = await fetch(`${origin}/api/cutoff/analyze-pdf`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({ examId, year })
@@ -68,57 +148,29 @@ export async function POST(request: NextRequest) {
       }
     }
 
-    // Check if PDF exists
-    if (!fs.existsSync(pdfPath)) {
-      return NextResponse.json(
-        { error: `PDF file not found: ${pdfFileName}` },
-        { status: 404 }
-      )
-    }
-
-    // Check if Python is available
-    let pythonCmd = 'python'
-    try {
-      await execAsync('python --version')
-    } catch {
-      try {
-        await execAsync('python3 --version')
-        pythonCmd = 'python3'
-      } catch {
-        return NextResponse.json(
-          { error: 'Python is not installed. Please install Python to parse PDFs.' },
-          { status: 500 }
-        )
-      }
-    }
-
-    // Step 2: Run the Python script with analysis data
-    // Use dynamic parser if analysis is available, otherwise use default
-    const scriptPath = analysis 
-      ? path.join(process.cwd(), 'scripts', 'parse_cutoff_dynamic.py')
-      : path.join(process.cwd(), 'scripts', 'parse_cutoff.py')
-    
-    let command = `${pythonCmd} "${scriptPath}" "${pdfPath}" "${csvPath}"`
-    
-    // Pass analysis as JSON string to dynamic parser
-    if (analysis) {
-      const analysisJson = JSON.stringify(analysis).replace(/"/g, '\\"')
-      command += ` "${analysisJson}"`
-    }
-    
+    // Step 2: Run the parser on the warm daemon with analysis data
+    // The daemon picks one parsing strategy for the whole PDF, from the analysis or the PDF's layout
+    // Round exams also get this round's cutoffs merged into the trend rollups
+    const examRound = parseExamRound(examId)
     try {
-      const { stdout, stderr } = await execAsync(command)
-      
-      if (stderr && !stderr.includes('tqdm') && !stderr.includes('Reading PDF')) {
-        console.error('Python script stderr:', stderr)
-      }
+      const { result, log } = await runParserCommand<{ record_count: number; strategy: string; metrics?: ParseMetrics }>('parse', {
+        pdf_path: pdfPath,
+        output_csv: csvPath,
+        analysis: analysis || null,
+        columns: true,
+        search_index: true,
+        page_cache: PAGE_CACHE_DIR,
+        metrics: true,
+        progress: true,
+        rollups: examRound ? { path: getRollupsPath(examRound.family), year, round: examRound.round } : null
+      }, onProgress)
       
       // Check if CSV was created (even if empty, it's still created)
       if (fs.existsSync(csvPath)) {
         const stats = fs.statSync(csvPath)
-        const csvContent = fs.readFileSync(csvPath, 'utf-8')
-        const hasData = csvContent.split('\n').length > 2 // More than header and empty line
-        const recordCount = hasData ? csvContent.split('\n').length - 2 : 0
+        // The parser reports how many rows it wrote
+        const recordCount = result.record_count
+        const hasData = recordCount > 0
         
         // Clear cache after parsing
         clearCache(examId)
@@ -132,6 +184,10 @@ export async function POST(request: NextRequest) {
           metadata.csvFileName = csvFileName
           metadata.hasData = hasData
           metadata.recordCount = recordCount
+          // Strategy the parser actually used, which can differ from the analysis' suggestion
+          metadata.parsingStrategy = result.strategy
+          // Phase / per-page timings, line counts and dropped rows for this parse
+          metadata.parseMetrics = result.metrics || null
           if (analysis) {
             metadata.pdfAnalysis = analysis
           }
@@ -139,46 +195,53 @@ export async function POST(request: NextRequest) {
         }
         
         if (hasData) {
-          return NextResponse.json({
-            success: true,
-            message: 'PDF parsed successfully',
-            csvPath: `/${csvFileName}`,
-            examId,
-            examName,
-            year,
-            size: stats.size,
-            recordCount: recordCount
-          })
+          return {
+            status: 200,
+            body: {
+              success: true,
+              message: 'PDF parsed successfully',
+              csvPath: `/${csvFileName}`,
+              examId,
+              examName,
+              year,
+              size: stats.size,
+              recordCount: recordCount
+            }
+          }
         } else {
-          return NextResponse.json({
-            success: false,
-            warning: 'PDF processed but no data extracted. The format might not be supported yet.',
-            csvPath: `/${csvFileName}`,
-            examId,
-            examName,
-            year,
-            analysis: analysis || null
-          }, { status: 200 }) // Return 200 but with warning
+          // Return 200 but with warning
+          return {
+            status: 200,
+            body: {
+              success: false,
+              warning: 'PDF processed but no data extracted. The format might not be supported yet.',
+              csvPath: `/${csvFileName}`,
+              examId,
+              examName,
+              year,
+              analysis: analysis || null
+            }
+          }
         }
       } else {
-        return NextResponse.json(
-          { error: 'CSV file was not created', stderr: stderr || 'No error message' },
-          { status: 500 }
-        )
+        return {
+          status: 500,
+          body: { error: 'CSV file was not created', stderr: log || 'No error message' }
+        }
       }
     } catch (error: any) {
       console.error('Parse error:', error)
-      return NextResponse.json(
-        { error: 'Failed to parse PDF', details: error.message },
-        { status: 500 }
-      )
+      return {
+        status: 500,
+        body: { error: 'Failed to parse PDF', details: error.message }
+      }
     }
   } catch (error: any) {
     console.error('Request error:', error)
-    return NextResponse.json(
-      { error: 'Internal server error', details: error.message },
-      { status: 500 }
-    )
+    return {
+      status: 500,
+      body: { error: 'Internal server error', details: error.message }
+    }
   }
 }
 
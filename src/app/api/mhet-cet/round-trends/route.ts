@@ -2,6 +2,7 @@ import { NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
 import { parse } from 'csv-parse/sync'
+import { findRoundCutoff, hasRound, loadRollups } from '@/lib/cutoff-rollups'
 
 interface MhetRecord {
   college_name: string
@@ -14,6 +15,9 @@ interface MhetRecord {
 
 const rounds = ['round1', 'round2', 'round3']
 
+// Rollups of every round: rollups_mht-cet-mh-cap.json
+const EXAM_FAMILY = 'mht-cet-mh-cap'
+
 function getRecordsForRound(round: string): MhetRecord[] {
   // Convert round1 -> round-1, round2 -> round-2, etc.
   const roundWithDash = round.replace('round', 'round-')
@@ -77,7 +81,24 @@ export async function GET(request: Request) {
       found: boolean
     }[] = []
 
+    const rollups = loadRollups(EXAM_FAMILY)
+
     for (const round of rounds) {
+      const roundName = round.charAt(0).toUpperCase() + round.slice(1).replace('round', 'Round ')
+
+      // Rounds the parser wrote rollups for are a key lookup instead of a CSV scan
+      if (rollups && hasRound(rollups, round)) {
+        const cutoff = findRoundCutoff(rollups, college, course, category, seatType, year, round)
+        trends.push({
+          round,
+          roundName,
+          rank: cutoff ? cutoff.rank || null : null,
+          percentile: cutoff ? cutoff.percentile || null : null,
+          found: Boolean(cutoff),
+        })
+        continue
+      }
+
       const records = getRecordsForRound(round)
 
       // Simple exact match search: college_name, category, seat_type, course_name
@@ -98,8 +119,6 @@ export async function GET(request: Request) {
         return collegeMatch && courseMatch && categoryMatch && seatTypeMatch
       })
 
-      const roundName = round.charAt(0).toUpperCase() + round.slice(1).replace('round', 'Round ')
-
       trends.push(
         match
           ? {
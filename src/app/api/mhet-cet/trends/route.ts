@@ -2,6 +2,7 @@ import { NextResponse } from 'next/server'
 import fs from 'fs'
 import path from 'path'
 import { parse } from 'csv-parse/sync'
+import { findRoundCutoff, hasRound, loadRollups } from '@/lib/cutoff-rollups'
 
 interface MhetRecord {
   college_name: string
@@ -16,6 +17,9 @@ interface MhetRecord {
 const years = ['2024-2025', '2023-2024', '2022-2023', '2021-2022', '2020-2021']
 const rounds = ['round1', 'round2', 'round3']
 
+// Rollups of every round: rollups_mht-cet-mh-cap.json
+const EXAM_FAMILY = 'mht-cet-mh-cap'
+
 function getRecordsForRound(round: string): MhetRecord[] {
   // Convert round1 -> round-1, round2 -> round-2, etc.
   const roundWithDash = round.replace('round', 'round-')
@@ -66,6 +70,30 @@ export async function GET(request: Request) {
       )
     }
 
+    // Rollups written by the parser have the cutoff of every year parsed so far: one key lookup
+    const rollups = loadRollups(EXAM_FAMILY)
+    if (rollups && hasRound(rollups, round)) {
+      const trends = years.map((year) => {
+        const cutoff = findRoundCutoff(rollups, college, course, category, seatType, year, round)
+        return {
+          year,
+          rank: cutoff ? cutoff.rank || null : null,
+          percentile: cutoff ? cutoff.percentile || null : null,
+          found: Boolean(cutoff),
+        }
+      })
+
+      return NextResponse.json({
+        success: true,
+        trends,
+        college,
+        category,
+        seatType,
+        course,
+        round,
+      })
+    }
+
     const collegeLower = college.toLowerCase().trim()
     const courseLower = course.toLowerCase().trim()
     const categoryLower = category.toLowerCase().trim()
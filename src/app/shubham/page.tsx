@@ -5,6 +5,10 @@ import { Upload, FileText, Loader2, CheckCircle, XCircle, ArrowRight } from 'luc
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import Link from 'next/link'
 import { examCategories } from '@/lib/exam-categories'
+import type { ParseProgress } from '@/lib/parser-daemon'
+
+// How often to ask upload-parse how its job is doing
+const JOB_POLL_INTERVAL = 1000
 
 export default function ShubhamPage() {
   const [file, setFile] = useState<File | null>(null)
@@ -18,6 +22,7 @@ export default function ShubhamPage() {
   const [error, setError] = useState('')
   const [examId, setExamId] = useState('')
   const [uploadProgress, setUploadProgress] = useState(0)
+  const [parseProgress, setParseProgress] = useState<ParseProgress | null>(null)
   const [debugging, setDebugging] = useState(false)
   const [debugResult, setDebugResult] = useState<any>(null)
 
@@ -56,6 +61,28 @@ export default function ShubhamPage() {
       .replace(/^-+|-+$/g, '')
   }
 
+  // Poll an upload-parse job until it finishes; pages parsed move the bar from 70% to 100%
+  const waitForParseJob = async (jobId: string) => {
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL))
+      const response = await fetch(`/api/cutoff/upload-parse?jobId=${encodeURIComponent(jobId)}`)
+      const job = await response.json()
+      if (!response.ok) {
+        throw new Error(job.error || 'Failed to check parsing progress')
+      }
+
+      if (job.progress) {
+        setParseProgress(job.progress)
+        if (job.progress.totalPages) {
+          setUploadProgress(70 + (job.progress.pagesDone / job.progress.totalPages) * 30)
+        }
+      }
+      if (job.status === 'done' || job.status === 'failed') {
+        return job
+      }
+    }
+  }
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault()
     
@@ -87,6 +114,7 @@ export default function ShubhamPage() {
     setSuccess(false)
     setUploading(true)
     setUploadProgress(0)
+    setParseProgress(null)
 
     try {
       // Create FormData
@@ -130,8 +158,17 @@ export default function ShubhamPage() {
             })
           })
           .then(async (response) => {
-            const result = await response.json()
-            if (response.ok) {
+            const started = await response.json()
+            if (!response.ok) {
+              setError(started.error || 'Failed to parse PDF')
+              setParsing(false)
+              return
+            }
+
+            // Parsing runs as a background job on the server
+            const job = await waitForParseJob(started.jobId)
+            const result = job.result || {}
+            if (job.status === 'done') {
               setUploadProgress(100)
               if (result.warning) {
                 // Show warning but still mark as success
@@ -388,7 +425,12 @@ export default function ShubhamPage() {
                 <div className="space-y-2">
                   <div className="flex items-center justify-between text-sm">
                     <span className="text-gray-400">
-                      {uploading ? 'Uploading...' : uploadProgress < 70 ? 'Analyzing PDF structure...' : 'Parsing PDF...'}
+                      {uploading
+                        ? 'Uploading...'
+                        : parseProgress
+                          ? `Parsing PDF... page ${parseProgress.pagesDone} of ${parseProgress.totalPages}, ${parseProgress.rowsSoFar} rows` +
+                            (parseProgress.etaSeconds !== null ? `, ~${Math.ceil(parseProgress.etaSeconds)}s left` : '')
+                          : 'Analyzing PDF structure...'}
                     </span>
                     <span className="text-gray-400">{Math.round(uploadProgress)}%</span>
                   </div>
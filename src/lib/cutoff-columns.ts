@@ -0,0 +1,128 @@
+/**
+ * Columnar Cutoff Loader
+ * Reads the cutoffs_<examId>.columns.bin/.json pair written by the Python parsers
+ * (--columns) so routes can skip re-tokenizing the whole CSV
+ */
+
+import fs from 'fs'
+
+// Must match COLUMNS_VERSION in scripts/cutoff_columns.py
+const COLUMNS_VERSION = 1
+
+type ColumnInfo = {
+  type: 'int32' | 'float64'
+  offset: number
+  byteLength: number
+  dictionary?: string
+}
+
+type ColumnsManifest = {
+  version: number
+  rowCount: number
+  csvBytes: number
+  binFile: string
+  columns: Record<string, ColumnInfo>
+  dictionaries: {
+    college: [string, string][]
+    course: [string, string][]
+    seat_type: string[]
+    category: string[]
+  }
+}
+
+export type CutoffTable = {
+  rowCount: number
+  percentile: Float64Array
+  rank: Int32Array
+  college: Int32Array
+  course: Int32Array
+  seatType: Int32Array
+  category: Int32Array
+  dictionaries: ColumnsManifest['dictionaries']
+}
+
+export function getColumnsPaths(csvPath: string) {
+  const base = csvPath.endsWith('.csv') ? csvPath.slice(0, -4) : csvPath
+  return {
+    binPath: `${base}.columns.bin`,
+    manifestPath: `${base}.columns.json`
+  }
+}
+
+function readColumn(data: Uint8Array, info: ColumnInfo) {
+  if (info.type === 'float64') {
+    return new Float64Array(data.buffer, info.offset, info.byteLength / 8)
+  }
+  return new Int32Array(data.buffer, info.offset, info.byteLength / 4)
+}
+
+/**
+ * Load the columnar copy of a cutoff CSV, or null if it is missing or out of date
+ */
+export function loadCutoffTable(csvPath: string): CutoffTable | null {
+  const { binPath, manifestPath } = getColumnsPaths(csvPath)
+  if (!fs.existsSync(manifestPath) || !fs.existsSync(binPath) || !fs.existsSync(csvPath)) {
+    return null
+  }
+
+  try {
+    const manifest: ColumnsManifest = JSON.parse(fs.readFileSync(manifestPath, 'utf-8'))
+
+    // The CSV was replaced without regenerating the columns
+    if (manifest.version !== COLUMNS_VERSION || fs.statSync(csvPath).size !== manifest.csvBytes) {
+      return null
+    }
+
+    // Read into a fresh buffer so every column's offset stays 8-byte aligned
+    const size = fs.statSync(binPath).size
+    const data = new Uint8Array(size)
+    const fd = fs.openSync(binPath, 'r')
+    try {
+      fs.readSync(fd, data, 0, size, 0)
+    } finally {
+      fs.closeSync(fd)
+    }
+
+    const { columns } = manifest
+    return {
+      rowCount: manifest.rowCount,
+      percentile: readColumn(data, columns.percentile) as Float64Array,
+      rank: readColumn(data, columns.rank) as Int32Array,
+      college: readColumn(data, columns.college) as Int32Array,
+      course: readColumn(data, columns.course) as Int32Array,
+      seatType: readColumn(data, columns.seat_type) as Int32Array,
+      category: readColumn(data, columns.category) as Int32Array,
+      dictionaries: manifest.dictionaries
+    }
+  } catch (error) {
+    console.error('Failed to load columnar cutoffs, falling back to CSV:', error)
+    return null
+  }
+}
+
+/**
+ * Same record objects the csv-parse path produces, built from the columnar copy.
+ * Returns null when there is no usable columnar copy.
+ */
+export function loadColumnarRecords(csvPath: string): any[] | null {
+  const table = loadCutoffTable(csvPath)
+  if (!table) return null
+
+  const { college, course, seat_type, category } = table.dictionaries
+  const records = new Array(table.rowCount)
+  for (let i = 0; i < table.rowCount; i++) {
+    const [collegeCode, collegeName] = college[table.college[i]]
+    const [courseCode, courseName] = course[table.course[i]]
+    records[i] = {
+      college_code: collegeCode,
+      college_name: collegeName,
+      course_code: courseCode,
+      course_name: courseName,
+      seat_type: seat_type[table.seatType[i]],
+      category: category[table.category[i]],
+      rank: table.rank[i],
+      percentile: table.percentile[i]
+    }
+  }
+  return records
+}
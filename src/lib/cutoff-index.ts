@@ -0,0 +1,133 @@
+/**
+ * Cutoff Search Index Loader
+ * Reads the cutoffs_<examId>.index.json written by the Python parsers (--search-index)
+ * so /api/cutoff/recommend can answer "cutoffs my percentile clears for this course
+ * and location" with binary searches and posting lists instead of scanning every row
+ */
+
+import fs from 'fs'
+
+// Must match INDEX_VERSION in scripts/cutoff_index.py
+const INDEX_VERSION = 2
+
+export type SearchIndex = {
+  version: number
+  rowCount: number
+  csvBytes: number
+  // "<category>|<seat_type>" -> row ids sorted by percentile (ascending)
+  buckets: Record<string, number[]>
+  // lowercased word of the course name -> row ids (ascending)
+  courseTokens: Record<string, number[]>
+  courses: string[]
+  categories: string[]
+}
+
+export function getIndexPath(csvPath: string) {
+  const base = csvPath.endsWith('.csv') ? csvPath.slice(0, -4) : csvPath
+  return `${base}.index.json`
+}
+
+/**
+ * Load the search index of a cutoff CSV, or null if it is missing or out of date
+ */
+export function loadSearchIndex(csvPath: string): SearchIndex | null {
+  const indexPath = getIndexPath(csvPath)
+  if (!fs.existsSync(indexPath) || !fs.existsSync(csvPath)) {
+    return null
+  }
+
+  try {
+    const index: SearchIndex = JSON.parse(fs.readFileSync(indexPath, 'utf-8'))
+
+    // The CSV was replaced without regenerating the index
+    if (index.version !== INDEX_VERSION || fs.statSync(csvPath).size !== index.csvBytes) {
+      return null
+    }
+    return index
+  } catch (error) {
+    console.error('Failed to load search index, falling back to scanning rows:', error)
+    return null
+  }
+}
+
+/**
+ * Lowercased alphanumeric words, the way cutoff_index.py tokenises names
+ */
+export function tokenize(text: string): string[] {
+  return Array.from(new Set(text.toLowerCase().match(/[a-z0-9]+/g) || []))
+}
+
+export function intersectSorted(a: number[], b: number[]): number[] {
+  const result: number[] = []
+  let i = 0
+  let j = 0
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      result.push(a[i])
+      i++
+      j++
+    } else if (a[i] < b[j]) {
+      i++
+    } else {
+      j++
+    }
+  }
+  return result
+}
+
+export function unionSorted(lists: number[][]): number[] {
+  const ids = new Set<number>()
+  for (const list of lists) {
+    for (const id of list) ids.add(id)
+  }
+  return Array.from(ids).sort((a, b) => a - b)
+}
+
+/**
+ * Ids of rows with every token of text (null when text has no tokens)
+ */
+export function allTokensPostings(postings: Record<string, number[]>, text: string): number[] | null {
+  const words = tokenize(text)
+  if (words.length === 0) return null
+
+  let ids: number[] | null = null
+  for (const word of words) {
+    const list = postings[word] || []
+    ids = ids === null ? list : intersectSorted(ids, list)
+    if (ids.length === 0) break
+  }
+  return ids
+}
+
+/**
+ * Ids (ascending) of rows whose cutoff percentile is above 0 and at most `percentile`,
+ * from the buckets of the given categories (all categories when null)
+ */
+export function percentileCandidates(
+  records: any[],
+  index: SearchIndex,
+  percentile: number,
+  categories: string[] | null
+): number[] {
+  const ids: number[] = []
+
+  for (const [bucket, rows] of Object.entries(index.buckets)) {
+    const category = bucket.slice(0, bucket.indexOf('|'))
+    if (categories && !categories.includes(category)) continue
+
+    // First row whose percentile is above the user's: everything before it is cleared
+    let low = 0
+    let high = rows.length
+    while (low < high) {
+      const mid = (low + high) >> 1
+      if ((parseFloat(records[rows[mid]].percentile) || 0) <= percentile) {
+        low = mid + 1
+      } else {
+        high = mid
+      }
+    }
+    for (let i = 0; i < low; i++) ids.push(rows[i])
+  }
+
+  return ids.sort((a, b) => a - b)
+}
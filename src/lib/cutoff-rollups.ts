@@ -0,0 +1,135 @@
+/**
+ * Trend Rollups Loader
+ * Reads the rollups_<exam family>.json files written by the Python parsers (--rollups):
+ * min / max / first / last rank and percentile per (college_code, course_code, category, seat_type)
+ * for every round and year parsed so far, so trend routes skip scanning round CSVs
+ */
+
+import fs from 'fs'
+import path from 'path'
+
+// Must match ROLLUPS_VERSION in scripts/cutoff_rollups.py
+const ROLLUPS_VERSION = 2
+
+// [minRank, maxRank, lastRank, minPercentile, maxPercentile, lastPercentile, firstRank, firstPercentile]
+// (STATS_FIELDS). Rows with neither a rank nor a percentile are not in the stats
+export type RollupStats = [number, number, number, number, number, number, number, number]
+
+export type RollupEntry = {
+  college: string
+  course: string
+  rounds: Record<string, RollupStats> // "<year>/<round>" -> stats
+  years: Record<string, RollupStats>
+  firstRows: Record<string, number> // "<year>/<round>" -> position of the key's first row in that round's CSV
+}
+
+type RollupsFile = {
+  version: number
+  fields: string[]
+  partitions: Record<string, string[]> // year -> rounds
+  keys: Record<string, RollupEntry>
+}
+
+export type Rollups = RollupsFile & {
+  // "<category>|<seat type>" (lowercased) -> entries, for name lookups
+  buckets: Map<string, RollupEntry[]>
+}
+
+let cachedRollups: Record<string, { mtimeMs: number; rollups: Rollups | null }> = {}
+
+export function getRollupsPath(examFamily: string) {
+  return path.join(process.cwd(), 'public', `rollups_${examFamily}.json`)
+}
+
+/**
+ * mht-cet-mh-cap-round-2 -> { family: 'mht-cet-mh-cap', round: 'round2' }, or null without a round
+ */
+export function parseExamRound(examId: string) {
+  const match = examId.match(/^(.+)-round-(\d+)$/)
+  return match ? { family: match[1], round: `round${match[2]}` } : null
+}
+
+function bucketKey(category: string, seatType: string) {
+  return `${category.toLowerCase().trim()}|${seatType.toLowerCase().trim()}`
+}
+
+/**
+ * Load an exam family's rollups (cached until the file changes), or null if there are none
+ */
+export function loadRollups(examFamily: string): Rollups | null {
+  const rollupsPath = getRollupsPath(examFamily)
+  if (!fs.existsSync(rollupsPath)) return null
+
+  const { mtimeMs } = fs.statSync(rollupsPath)
+  const cached = cachedRollups[examFamily]
+  if (cached && cached.mtimeMs === mtimeMs) return cached.rollups
+
+  let rollups: Rollups | null = null
+  try {
+    const file: RollupsFile = JSON.parse(fs.readFileSync(rollupsPath, 'utf-8'))
+    if (file.version === ROLLUPS_VERSION) {
+      const buckets = new Map<string, RollupEntry[]>()
+      for (const [key, entry] of Object.entries(file.keys)) {
+        // key is college_code|course_code|category|seat_type
+        const [, , category, seatType] = key.split('|')
+        const bucket = bucketKey(category, seatType)
+        if (!buckets.has(bucket)) buckets.set(bucket, [])
+        buckets.get(bucket)!.push(entry)
+      }
+      rollups = { ...file, buckets }
+    }
+  } catch (error) {
+    console.error('Failed to load rollups, falling back to CSV:', error)
+  }
+
+  cachedRollups[examFamily] = { mtimeMs, rollups }
+  return rollups
+}
+
+/**
+ * Whether any year of the rollups has this round, i.e. it can answer lookups for it
+ */
+export function hasRound(rollups: Rollups, round: string) {
+  return Object.values(rollups.partitions).some((rounds) => rounds.includes(round))
+}
+
+/**
+ * { rank, percentile } a college / course has in a category and seat type in one round, or null if
+ * no key matches there. Names match the way the trend routes match CSV rows (either name contains the
+ * other), and of several matching keys the one whose first row comes first in the CSV wins, so this is
+ * the row the CSV scan would find
+ */
+export function findRoundCutoff(
+  rollups: Rollups,
+  college: string,
+  course: string,
+  category: string,
+  seatType: string,
+  year: string,
+  round: string
+) {
+  const collegeLower = college.toLowerCase().trim()
+  const courseLower = course.toLowerCase().trim()
+  const partition = `${year}/${round}`
+  const entries = rollups.buckets.get(bucketKey(category, seatType)) || []
+
+  let best: RollupEntry | null = null
+  for (const entry of entries) {
+    const stats = entry.rounds[partition]
+    if (!stats) continue
+    if (best && best.firstRows[partition] <= entry.firstRows[partition]) continue
+
+    const entryCollege = entry.college.toLowerCase().trim()
+    const entryCourse = entry.course.toLowerCase().trim()
+    if (
+      (entryCollege.includes(collegeLower) || collegeLower.includes(entryCollege)) &&
+      (entryCourse.includes(courseLower) || courseLower.includes(entryCourse))
+    ) {
+      best = entry
+    }
+  }
+
+  if (!best) return null
+  const stats = best.rounds[partition]
+  return { rank: stats[6], percentile: stats[7] }
+}
@@ -0,0 +1,142 @@
+/**
+ * Parse Job Queue
+ * Runs upload-parse work in the background so the request returns a job id right away.
+ * At most MAX_RUNNING_JOBS parses run at once (the rest wait in order), and each job
+ * keeps the parser's latest progress record for the status route to poll.
+ */
+
+import { randomUUID } from 'crypto'
+import type { ParseProgress } from './parser-daemon'
+
+// Parses share the daemon's page pool; two keep it busy while one of them is writing out
+const MAX_RUNNING_JOBS = 2
+
+// Finished jobs stay pollable this long
+const FINISHED_JOB_TTL = 60 * 60 * 1000 // 1 hour
+
+export type ParseJobStatus = 'queued' | 'running' | 'done' | 'failed'
+
+// What the route would have answered had it parsed inline
+export type ParseJobResponse = {
+  status: number
+  body: any
+}
+
+export type ParseJob = {
+  id: string
+  examId: string
+  year: string
+  status: ParseJobStatus
+  createdAt: number
+  startedAt: number | null
+  finishedAt: number | null
+  progress: ParseProgress | null
+  response: ParseJobResponse | null
+}
+
+type ParseJobRunner = (onProgress: (progress: ParseProgress) => void) => Promise<ParseJobResponse>
+
+type JobQueueState = {
+  jobs: Map<string, ParseJob>
+  waiting: { job: ParseJob; run: ParseJobRunner }[]
+  running: number
+}
+
+// Keep the queue on globalThis so dev-mode module reloads don't lose running jobs
+const globalForJobs = globalThis as unknown as { parseJobs?: JobQueueState }
+
+function getQueue(): JobQueueState {
+  if (!globalForJobs.parseJobs) {
+    globalForJobs.parseJobs = { jobs: new Map(), waiting: [], running: 0 }
+  }
+  return globalForJobs.parseJobs
+}
+
+function pruneFinishedJobs(queue: JobQueueState) {
+  const now = Date.now()
+  for (const [id, job] of queue.jobs) {
+    if (job.finishedAt !== null && now - job.finishedAt > FINISHED_JOB_TTL) {
+      queue.jobs.delete(id)
+    }
+  }
+}
+
+function startWaitingJobs(queue: JobQueueState) {
+  while (queue.running < MAX_RUNNING_JOBS && queue.waiting.length > 0) {
+    const { job, run } = queue.waiting.shift()!
+    queue.running++
+    job.status = 'running'
+    job.startedAt = Date.now()
+
+    run((progress) => {
+      job.progress = progress
+    })
+      .then((response) => {
+        job.status = response.status < 400 ? 'done' : 'failed'
+        job.response = response
+      })
+      .catch((error: any) => {
+        console.error('Parse job failed:', error)
+        job.status = 'failed'
+        job.response = { status: 500, body: { error: 'Failed to parse PDF', details: error.message } }
+      })
+      .finally(() => {
+        job.finishedAt = Date.now()
+        queue.running--
+        startWaitingJobs(queue)
+      })
+  }
+}
+
+/**
+ * The queued or running job for examId, whatever its year. Uploads of one exam all
+ * write cutoffs_<examId>.csv, so only one may be in flight at a time
+ */
+export function getActiveParseJob(examId: string): ParseJob | null {
+  for (const job of getQueue().jobs.values()) {
+    if (job.examId === examId && job.finishedAt === null) return job
+  }
+  return null
+}
+
+/**
+ * Queue a parse of examId's year PDF and return its job. While one for the same exam
+ * and year is still queued or running that job is returned instead; callers check
+ * getActiveParseJob() first to turn away another year of the same exam
+ */
+export function enqueueParseJob(examId: string, year: string, run: ParseJobRunner): ParseJob {
+  const queue = getQueue()
+  pruneFinishedJobs(queue)
+
+  for (const job of queue.jobs.values()) {
+    if (job.examId === examId && job.year === year && job.finishedAt === null) return job
+  }
+
+  const job: ParseJob = {
+    id: randomUUID(),
+    examId,
+    year,
+    status: 'queued',
+    createdAt: Date.now(),
+    startedAt: null,
+    finishedAt: null,
+    progress: null,
+    response: null
+  }
+  queue.jobs.set(job.id, job)
+  queue.waiting.push({ job, run })
+  startWaitingJobs(queue)
+  return job
+}
+
+export function getParseJob(jobId: string): ParseJob | null {
+  return getQueue().jobs.get(jobId) || null
+}
+
+/**
+ * Place of a queued job in line (1 = starts next), 0 once it is running or finished
+ */
+export function getQueuePosition(job: ParseJob): number {
+  const index = getQueue().waiting.findIndex((entry) => entry.job === job)
+  return index === -1 ? 0 : index + 1
+}
@@ -0,0 +1,167 @@
+/**
+ * Parser Daemon Client
+ * Talks to scripts/parser_daemon.py over stdin/stdout JSON lines so API routes
+ * reuse one warm Python process (and its page-parsing pool) instead of
+ * spawning an interpreter per request.
+ */
+
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process'
+import path from 'path'
+import readline from 'readline'
+
+type PendingRequest = {
+  resolve: (value: any) => void
+  reject: (error: Error) => void
+  onProgress?: (progress: ParseProgress) => void
+}
+
+type DaemonState = {
+  child: ChildProcessWithoutNullStreams
+  pending: Map<number, PendingRequest>
+  nextId: number
+}
+
+export type ParserResponse<T> = {
+  result: T
+  log: string
+}
+
+// What a "parse" with metrics: true returns as result.metrics (scripts/parse_metrics.py)
+export type ParseMetrics = {
+  totalSeconds: number
+  phaseSeconds: { open: number; extract: number; parse: number; write: number }
+  pageCount: number
+  cacheHits: number
+  // Pages the pre-scan found no cutoffs or headings on (not extracted)
+  prunedPages: number
+  linesByType: Record<string, number>
+  rowsEmitted: number
+  rowsDropped: Record<string, number>
+  pages: {
+    page: number
+    extractSeconds: number
+    parseSeconds: number
+    cacheHit: boolean
+    pruned: boolean
+    rows: number
+  }[]
+}
+
+// What a "parse" with progress: true sends while it runs (ParseMetrics.progress_record)
+export type ParseProgress = {
+  pagesDone: number
+  totalPages: number | null
+  rowsSoFar: number
+  elapsedSeconds: number
+  etaSeconds: number | null
+}
+
+// Parsed-page cache shared by every parse, so re-uploads only re-extract changed pages;
+// also holds the sampled page text analyze-pdf, debug-pdf and the parse share
+export const PAGE_CACHE_DIR = path.join(process.cwd(), '.parse-cache')
+
+// Keep the daemon on globalThis so dev-mode module reloads don't spawn a new one each time
+const globalForDaemon = globalThis as unknown as { parserDaemon?: DaemonState | null }
+
+function getPythonCommand() {
+  return process.platform === 'win32' ? 'python' : 'python3'
+}
+
+function failPending(state: DaemonState, error: Error) {
+  for (const { reject } of state.pending.values()) {
+    reject(error)
+  }
+  state.pending.clear()
+}
+
+function startDaemon(): DaemonState {
+  const scriptPath = path.join(process.cwd(), 'scripts', 'parser_daemon.py')
+  const child = spawn(getPythonCommand(), [scriptPath], {
+    cwd: process.cwd(),
+    stdio: ['pipe', 'pipe', 'pipe']
+  })
+
+  const state: DaemonState = { child, pending: new Map(), nextId: 1 }
+
+  readline.createInterface({ input: child.stdout }).on('line', (line) => {
+    let message: any
+    try {
+      message = JSON.parse(line)
+    } catch {
+      console.error('Parser daemon sent invalid JSON:', line)
+      return
+    }
+
+    const request = state.pending.get(message.id)
+
+    // Progress of a running request; anything else (the startup notice) isn't a response
+    if (message.event) {
+      if (message.event === 'progress' && request?.onProgress) request.onProgress(message.progress)
+      return
+    }
+
+    if (!request) return
+    state.pending.delete(message.id)
+
+    if (message.ok) {
+      request.resolve({ result: message.result, log: message.log || '' })
+    } else {
+      const error: any = new Error(message.error || 'Parser daemon request failed')
+      error.log = message.log || ''
+      request.reject(error)
+    }
+  })
+
+  child.stderr.on('data', (data: Buffer) => {
+    const text = data.toString()
+    if (!text.includes('Processing pages') && !text.includes('it/s')) {
+      console.error('Parser daemon stderr:', text)
+    }
+  })
+
+  child.on('error', (error: any) => {
+    const message = error.code === 'ENOENT'
+      ? 'Python is not installed. Please install Python to parse PDFs.'
+      : `Parser daemon failed: ${error.message}`
+    failPending(state, new Error(message))
+    if (globalForDaemon.parserDaemon === state) globalForDaemon.parserDaemon = null
+  })
+
+  child.on('exit', (code) => {
+    failPending(state, new Error(`Parser daemon exited with code ${code}`))
+    if (globalForDaemon.parserDaemon === state) globalForDaemon.parserDaemon = null
+  })
+
+  return state
+}
+
+function getDaemon(): DaemonState {
+  if (!globalForDaemon.parserDaemon) {
+    globalForDaemon.parserDaemon = startDaemon()
+  }
+  return globalForDaemon.parserDaemon
+}
+
+/**
+ * Run a command ("parse", "sample", "detailed_sample", "ping") on the warm parser daemon.
+ * Rejects with the Python error message if the command fails.
+ * onProgress gets the progress records of a "parse" run with progress: true.
+ */
+export function runParserCommand<T = any>(
+  command: string,
+  args: Record<string, unknown> = {},
+  onProgress?: (progress: ParseProgress) => void
+): Promise<ParserResponse<T>> {
+  const state = getDaemon()
+  const id = state.nextId++
+
+  return new Promise((resolve, reject) => {
+    state.pending.set(id, { resolve, reject, onProgress })
+    state.child.stdin.write(JSON.stringify({ id, command, args }) + '\n', (error) => {
+      if (error) {
+        state.pending.delete(id)
+        reject(error)
+      }
+    })
+  })
+}